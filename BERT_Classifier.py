@@ -1,24 +1,19 @@
 import pandas as pd
-import re
 import torch
 from sklearn.model_selection import train_test_split
 from transformers import BertTokenizer, BertForSequenceClassification, Trainer, TrainingArguments
 from sklearn.metrics import accuracy_score, classification_report
-
-# Fonction de nettoyage du texte
-def clean_text(text):
-    """Fonction de prétraitement basique : 
-       conversion en minuscules, suppression des URLs et caractères spéciaux."""
-    text = text.lower()
-    text = re.sub(r"http\S+", "", text)  # Supprime les URLs
-    text = re.sub(r"[^a-zA-Z\s]", "", text)  # Ne garde que les lettres et espaces
-    return text
+from preprocess import clean_texts
+from dedup import drop_near_duplicates
 
 # Chargez votre dataset nettoyé (all_news_cleaned.csv)
 df = pd.read_csv("data/all_news_cleaned.csv")
 
 # Appliquer le prétraitement sur la colonne des textes
-df['text'] = df['text'].apply(clean_text)
+df['text'] = clean_texts(df['text'], workers=None)
+
+# Retirer les quasi-doublons avant le split (seuil DEDUP_THRESHOLD), comme les autres scripts d'entraînement
+df, _ = drop_near_duplicates(df, 'text', report_path="results/dedup_report.json")
 
 # Séparer les données en ensembles d'entraînement et de test
 X_train, X_test, y_train, y_test = train_test_split(df['text'], df['label'], test_size=0.2, random_state=42)
@@ -1,34 +1,13 @@
-import pandas as pd
-import re
-from sklearn.model_selection import train_test_split
-from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.ensemble import GradientBoostingClassifier
 from sklearn.metrics import accuracy_score, classification_report
 import joblib
+from feature_cache import load_features
 
-def clean_text(text):
-    """Fonction de prétraitement basique : 
-       conversion en minuscules, suppression des URLs et caractères spéciaux."""
-    text = text.lower()
-    text = re.sub(r"http\S+", "", text)  # Supprime les URLs
-    text = re.sub(r"[^a-zA-Z\s]", "", text)  # Ne garde que les lettres et espaces
-    return text
-
-# Chargez votre dataset nettoyé (all_news_cleaned.csv)
-df = pd.read_csv("data/all_news_cleaned.csv")
-
-# Appliquer le prétraitement sur la colonne des textes
-df['text'] = df['text'].apply(clean_text)
-
-# Séparer les données en ensembles d'entraînement et de test
-X_train, X_test, y_train, y_test = train_test_split(df['text'], df['label'], test_size=0.2, random_state=42)
-
-# Initialiser le TfidfVectorizer
-vectorizer = TfidfVectorizer(stop_words="english", max_features=10000)
-
-# Transformation des textes en vecteurs TF-IDF
-X_train_tfidf = vectorizer.fit_transform(X_train)
-X_test_tfidf = vectorizer.transform(X_test)
+# Textes nettoyés, split et TF-IDF de all_news_cleaned.csv, relus depuis le
+# cache partagé par les scripts d'entraînement (calculés au premier appel)
+features = load_features("data/all_news_cleaned.csv")
+X_train_tfidf, X_test_tfidf = features.X_train, features.X_test
+y_train, y_test, vectorizer = features.y_train, features.y_test, features.vectorizer
 
 # Entraînement du modèle Gradient Boosting
 print("Entraînement du modèle Gradient Boosting...")
@@ -0,0 +1,88 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+
+
+class Overloaded(Exception):
+    """Requête refusée (file du modèle pleine ou limite du client atteinte) ; à renvoyer en 429."""
+
+    def __init__(self, reason, model, retry_after):
+        super().__init__(f"{reason} ({model}), réessayer dans {retry_after}s")
+        self.reason = reason
+        self.model = model
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Files bornées par modèle : une requête admise occupe une place jusqu'à la
+    fin de son calcul (en attente ou en cours). Quand la file d'un modèle est
+    pleine, la requête est refusée tout de suite au lieu d'attendre sans
+    limite ; une surcharge de BERT ne retarde donc pas les modèles TF-IDF.
+    """
+
+    def __init__(self, limits, concurrency=None):
+        # 0 = file non bornée
+        self.limits = limits
+        self.concurrency = concurrency or {}
+        self.pending = {}
+        # Moyenne glissante de la durée d'un calcul, pour estimer Retry-After
+        self.service_time = {}
+        self.rejected = {}
+        self.lock = threading.Lock()
+
+    def acquire(self, model):
+        limit = self.limits.get(model, 0)
+        with self.lock:
+            pending = self.pending.get(model, 0)
+            if limit and pending >= limit:
+                self.rejected[model] = self.rejected.get(model, 0) + 1
+                raise Overloaded("queue_full", model, self.retry_after(model, pending))
+            self.pending[model] = pending + 1
+
+    def release(self, model, seconds=None):
+        with self.lock:
+            self.pending[model] -= 1
+            if seconds is not None:
+                previous = self.service_time.get(model)
+                self.service_time[model] = seconds if previous is None else 0.9 * previous + 0.1 * seconds
+
+    def retry_after(self, model, pending):
+        """Secondes estimées pour vider la file : durée moyenne × requêtes en file / requêtes en parallèle."""
+        service_time = self.service_time.get(model, 1.0)
+        return max(1, math.ceil(service_time * pending / max(1, self.concurrency.get(model, 1))))
+
+    def occupancy(self):
+        with self.lock:
+            return {model: self.pending.get(model, 0) for model in self.limits}
+
+
+class RateLimiter:
+    """
+    Seau à jetons par client : `rate` requêtes par seconde en moyenne, avec
+    des rafales jusqu'à `burst`. Les seaux des clients les moins récents sont
+    oubliés au-delà de `max_clients`.
+    """
+
+    def __init__(self, rate, burst, max_clients=10000):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self.buckets = OrderedDict()
+        self.lock = threading.Lock()
+
+    def acquire(self, client):
+        now = time.monotonic()
+        with self.lock:
+            tokens, updated = self.buckets.pop(client, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            if tokens < 1:
+                self.buckets[client] = (tokens, now)
+                raise Overloaded("rate_limited", client, max(1, math.ceil((1 - tokens) / self.rate)))
+            self.buckets[client] = (tokens - 1, now)
+            while len(self.buckets) > self.max_clients:
+                self.buckets.popitem(last=False)
+
+    def clients(self):
+        return len(self.buckets)
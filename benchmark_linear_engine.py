@@ -0,0 +1,88 @@
+"""
+Contrôle de parité et benchmark du chemin rapide de la régression logistique
+(linear_engine.py) face au predict_proba de scikit-learn.
+
+Par défaut, utilise model/fake_news_classifier.pkl et des articles de
+data/all_news_cleaned.csv ; --synthetic entraîne une régression logistique
+sur des données TF-IDF aléatoires (utile sans les artefacts). Les
+probabilités doivent être identiques, sans tolérance.
+
+Exemples :
+    python benchmark_linear_engine.py
+    python benchmark_linear_engine.py --synthetic --rows 1000
+"""
+
+import argparse
+import sys
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from linear_engine import compile_linear
+from preprocess import clean_text
+
+
+def load_trained(n_rows):
+    vectorizer = joblib.load("model/logreg_tfidf_vectorizer.pkl")
+    df = pd.read_csv("data/all_news_cleaned.csv", nrows=n_rows)
+    X = vectorizer.transform(df["text"].astype(str).apply(clean_text))
+    return joblib.load("model/fake_news_classifier.pkl"), X
+
+
+def load_synthetic(n_rows):
+    from sklearn.linear_model import LogisticRegression
+
+    rng = np.random.RandomState(42)
+    X_train = sp.random(2000, 10000, density=0.005, format="csr", random_state=rng)
+    y_train = (X_train[:, :500].sum(axis=1).A1 > X_train[:, 500:1000].sum(axis=1).A1).astype(int)
+    model = LogisticRegression(max_iter=1000).fit(X_train, y_train)
+    return model, sp.random(n_rows, 10000, density=0.005, format="csr", random_state=rng)
+
+
+def best_time(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parité et benchmark du chemin rapide de la régression logistique")
+    parser.add_argument("--rows", type=int, default=2000, help="nombre d'articles évalués")
+    parser.add_argument("--batch-sizes", default="1,32,256")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--synthetic", action="store_true")
+    args = parser.parse_args()
+
+    model, X = load_synthetic(args.rows) if args.synthetic else load_trained(args.rows)
+    X = X.tocsr()
+    print(f"{X.shape[0]} lignes, {X.shape[1]} variables TF-IDF")
+    fast = compile_linear(model)
+
+    # Parité ligne par ligne et sur le batch entier
+    expected = model.predict_proba(X)
+    identical = np.array_equal(expected, fast.predict_proba(X)) and all(
+        np.array_equal(model.predict_proba(X[i]), fast.predict_proba(X[i])) for i in range(min(X.shape[0], 200))
+    )
+    print(f"Parité predict_proba : écart max {np.abs(expected - fast.predict_proba(X)).max():.2e} "
+          f"-> {'OK (identique)' if identical else 'ÉCHEC'}")
+
+    print(f"{'batch':>8}{'sklearn (ms)':>16}{'rapide (ms)':>16}{'gain':>8}")
+    for batch_size in [int(size) for size in args.batch_sizes.split(",")]:
+        batch = X[:batch_size]
+        sklearn_time = best_time(lambda: model.predict_proba(batch), args.repeat)
+        fast_time = best_time(lambda: fast.predict_proba(batch), args.repeat)
+        print(f"{batch.shape[0]:>8}{sklearn_time * 1000:>16.3f}{fast_time * 1000:>16.3f}"
+              f"{sklearn_time / fast_time:>7.1f}x")
+
+    if not identical:
+        sys.exit("Parité non respectée")
+
+
+if __name__ == "__main__":
+    main()
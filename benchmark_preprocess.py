@@ -0,0 +1,101 @@
+"""
+Contrôle de parité et benchmark du normaliseur de preprocess.py face à
+l'ancienne version (trois re.sub successifs).
+
+La parité est vérifiée sur les articles de data/all_news_cleaned.csv (s'il
+existe) et sur des cas limites générés : liens collés à de la ponctuation,
+tous les caractères Unicode (majuscules non ASCII, espaces Unicode...),
+textes aléatoires. Le débit est mesuré en textes par seconde pour l'ancienne
+version, la nouvelle, et clean_texts sur plusieurs processus.
+
+Exemples :
+    python benchmark_preprocess.py
+    python benchmark_preprocess.py --rows 20000 --workers 1,4,8
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+import pandas as pd
+
+from preprocess import clean_text, clean_texts
+
+
+def legacy_clean_text(text):
+    """Version de référence : celle de preprocess.py avant le passage unique."""
+    text = text.lower()
+    text = re.sub(r"http\S+", "", text)  # remove links
+    text = re.sub(r"[^a-zA-Z\s]", "", text)  # remove special characters
+    text = re.sub(r"\s+", " ", text).strip()  # remove extra spaces
+    return text
+
+
+def edge_cases(n_random, seed):
+    rng = random.Random(seed)
+    cases = [
+        "", "   ", "HTTP://EXAMPLE.COM/Path", "see:http://x.y/z,and https://a.b", "ht1tp://a", "xhttp://a b",
+        "a.http://x", "http", "httpHTTP", "İstanbul", "KÅ", "ß ﬁ Straße", "a b c　d",
+        "tab\tnew\nline\r\x0b\x0c\x1c\x1d\x1e\x1f\x85end", "café naïve", "12 345 !!! ???",
+    ]
+    # Chaque caractère Unicode, seul et entouré de lettres
+    cases += [chr(code) for code in range(0x110000) if not 0xD800 <= code <= 0xDFFF]
+    cases += [f"a{chr(code)}b http{chr(code)}x" for code in range(0, 0x3000)]
+    alphabet = "abcXYZ hHtTpP:/.\t\n  éİ0123456789!?-'\""
+    cases += ["".join(rng.choice(alphabet) for _ in range(rng.randint(0, 60))) for _ in range(n_random)]
+    return cases
+
+
+def throughput(fn, texts, repeat=3):
+    best = min(_timed(fn, texts) for _ in range(repeat))
+    return len(texts) / best
+
+
+def _timed(fn, texts):
+    start = time.perf_counter()
+    fn(texts)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parité et benchmark du normaliseur de texte")
+    parser.add_argument("--data", default="data/all_news_cleaned.csv")
+    parser.add_argument("--rows", type=int, default=10000, help="articles lus pour le benchmark")
+    parser.add_argument("--random-cases", type=int, default=100000)
+    parser.add_argument("--workers", default="1,4", help="nombres de processus testés pour clean_texts")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    corpus = []
+    if os.path.exists(args.data):
+        corpus = pd.read_csv(args.data, usecols=["text"], nrows=args.rows)["text"].astype(str).tolist()
+    cases = edge_cases(args.random_cases, args.seed) + corpus
+
+    mismatches = [text for text in cases if clean_text(text) != legacy_clean_text(text)]
+    print(f"Parité : {len(cases) - len(mismatches)}/{len(cases)} textes identiques")
+    for text in mismatches[:5]:
+        print(f"  ÉCART {text!r}: {legacy_clean_text(text)!r} != {clean_text(text)!r}")
+    if clean_texts(cases, workers=2) != [legacy_clean_text(text) for text in cases]:
+        mismatches.append("clean_texts")
+        print("  ÉCART : clean_texts sur 2 processus")
+
+    texts = corpus or cases[-args.random_cases:]
+    characters = sum(len(text) for text in texts)
+    print(f"\nDébit sur {len(texts)} textes ({characters / len(texts):.0f} caractères en moyenne)")
+    legacy = throughput(lambda batch: [legacy_clean_text(text) for text in batch], texts)
+    print(f"{'ancienne version (3 re.sub)':<34}{legacy:>12,.0f} textes/s")
+    single = throughput(lambda batch: [clean_text(text) for text in batch], texts)
+    print(f"{'clean_text (passage unique)':<34}{single:>12,.0f} textes/s   {single / legacy:.1f}x")
+    for workers in [int(count) for count in args.workers.split(",")]:
+        rate = throughput(lambda batch: clean_texts(batch, workers=workers), texts, repeat=1)
+        print(f"{f'clean_texts, {workers} processus':<34}{rate:>12,.0f} textes/s   {rate / legacy:.1f}x")
+
+    if mismatches:
+        sys.exit("Parité non respectée")
+
+
+if __name__ == "__main__":
+    main()
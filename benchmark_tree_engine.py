@@ -0,0 +1,105 @@
+"""
+Contrôle de parité et benchmark du moteur compilé (tree_engine.py) face au
+predict_proba de scikit-learn, pour le RandomForest et le GradientBoosting.
+
+Par défaut, utilise les modèles entraînés de model/ et des articles de
+data/all_news_cleaned.csv ; --synthetic entraîne de petits modèles sur des
+données TF-IDF aléatoires (utile sans les artefacts).
+
+Exemples :
+    python benchmark_tree_engine.py
+    python benchmark_tree_engine.py --synthetic --rows 1000
+"""
+
+import argparse
+import sys
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from preprocess import clean_text
+from tree_engine import compile_model
+
+MODEL_PATHS = {
+    "randomforest": "model/fake_news_random_forest_classifier.pkl",
+    "gradientboosting": "model/gradient_boosting_fake_news.pkl",
+}
+
+
+def load_trained(n_rows):
+    vectorizer = joblib.load("model/tfidf_vectorizer.pkl")
+    df = pd.read_csv("data/all_news_cleaned.csv", nrows=n_rows)
+    X = vectorizer.transform(df["text"].astype(str).apply(clean_text))
+    models = {name: joblib.load(path) for name, path in MODEL_PATHS.items()}
+    return models, X
+
+
+def load_synthetic(n_rows):
+    from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+
+    rng = np.random.RandomState(42)
+    X_train = sp.random(2000, 1000, density=0.01, format="csr", random_state=rng)
+    y_train = (X_train[:, :50].sum(axis=1).A1 > X_train[:, 50:100].sum(axis=1).A1).astype(int)
+    models = {
+        "randomforest": RandomForestClassifier(n_estimators=100, random_state=42).fit(X_train, y_train),
+        "gradientboosting": GradientBoostingClassifier(random_state=42).fit(X_train, y_train),
+    }
+    X = sp.random(n_rows, 1000, density=0.01, format="csr", random_state=rng)
+    return models, X
+
+
+def best_time(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parité et benchmark du moteur d'arbres compilé")
+    parser.add_argument("--rows", type=int, default=2000, help="nombre d'articles évalués")
+    parser.add_argument("--batch-sizes", default="1,32,256")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--tolerance", type=float, default=1e-6)
+    parser.add_argument("--synthetic", action="store_true")
+    args = parser.parse_args()
+
+    models, X = load_synthetic(args.rows) if args.synthetic else load_trained(args.rows)
+    X = X.tocsr()
+    print(f"{X.shape[0]} lignes, {X.shape[1]} variables TF-IDF")
+
+    parity_ok = True
+    for name, model in models.items():
+        start = time.perf_counter()
+        compiled = compile_model(model)
+        compile_time = time.perf_counter() - start
+
+        max_diff = np.abs(model.predict_proba(X) - compiled.predict_proba_compiled(X)).max()
+        status = "OK" if max_diff <= args.tolerance else "ÉCHEC"
+        parity_ok = parity_ok and max_diff <= args.tolerance
+        print(f"\n=== {name} ===")
+        print(f"Compilation : {compile_time:.2f}s, {compiled.nbytes / 1e6:.1f} Mo, "
+              f"{len(compiled.roots)} arbres, profondeur max {compiled.max_depth}, "
+              f"{len(compiled.used_features)} variables utilisées")
+        print(f"Parité predict_proba : écart max {max_diff:.2e} (tolérance {args.tolerance:.0e}) -> {status}")
+
+        print(f"{'batch':>8}{'sklearn (ms)':>16}{'compilé (ms)':>16}{'gain':>8}"
+              f"   (predict_proba délègue à sklearn au-delà de {compiled.max_compiled_batch} lignes)")
+        for batch_size in [int(size) for size in args.batch_sizes.split(",")]:
+            batch = X[:batch_size]
+            sklearn_time = best_time(lambda: model.predict_proba(batch), args.repeat)
+            compiled_time = best_time(lambda: compiled.predict_proba_compiled(batch), args.repeat)
+            print(f"{batch.shape[0]:>8}{sklearn_time * 1000:>16.3f}{compiled_time * 1000:>16.3f}"
+                  f"{sklearn_time / compiled_time:>7.1f}x")
+
+    if not parity_ok:
+        sys.exit("Parité non respectée")
+
+
+if __name__ == "__main__":
+    main()
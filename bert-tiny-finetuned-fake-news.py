@@ -1,6 +1,7 @@
 import pandas as pd
 from transformers import pipeline
 from tqdm import tqdm
+from bert_long import score_long_documents
 
 # 1. Charger le dataset
 df = pd.read_csv("data/all_news_cleaned.csv")
@@ -17,9 +18,14 @@ print("Chargement du modèle BERT compact...")
 classifier = pipeline("text-classification", model="mrm8488/bert-tiny-finetuned-fake-news")
 
 # 5. Prédictions sur tous les textes
+# Fenêtres glissantes de 512 tokens sur tout l'article (au lieu de tronquer à 512 caractères),
+# évaluées par batchs de 32 articles
 print("Prédiction en cours...")
-tqdm.pandas()  # Progress bar
-df['prediction'] = df['full_text'].progress_apply(lambda x: classifier(x[:512])[0]['label'])  # max 512 tokens
+predictions = []
+for start in tqdm(range(0, len(df), 32)):
+    batch = df['full_text'].iloc[start:start + 32].tolist()
+    predictions.extend(result['label'] for result in score_long_documents(classifier, batch))
+df['prediction'] = predictions
 
 # 6. Afficher les résultats
 print(df[['title', 'prediction']].head())
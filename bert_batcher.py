@@ -0,0 +1,108 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class BertMicroBatcher:
+    """
+    Regroupe les requêtes BERT concurrentes pour exécuter une seule passe
+    avant (avec padding) au lieu de plusieurs passes sur des batchs de taille 1.
+
+    Un batch part dès qu'il atteint max_batch_size textes ou que max_wait_ms
+    se sont écoulées depuis l'arrivée de son premier texte. Chaque requête
+    récupère ensuite sa propre prédiction via un Future.
+    """
+
+    def __init__(self, get_pipeline, max_batch_size=16, max_wait_ms=5, executor=None, on_batch=None,
+                 forward=None):
+        # Fonction renvoyant le pipeline : il peut être chargé (ou rechargé) à la demande
+        self.get_pipeline = get_pipeline
+        # Fonction (pipeline, textes) -> sorties ; par défaut un appel direct au pipeline
+        self.forward = forward
+        # Appelée avec (taille du batch, durée de la passe avant) après chaque batch
+        self.on_batch = on_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        # Par défaut un seul thread : les passes avant s'exécutent l'une après
+        # l'autre, sans bloquer la boucle asyncio qui continue à remplir la file.
+        self.owns_executor = executor is None
+        self.executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix="bert-batcher")
+        self.queue = None
+        self.worker = None
+
+    def start(self):
+        if self.worker is None:
+            self.queue = asyncio.Queue()
+            self.worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self.worker is not None:
+            self.worker.cancel()
+            try:
+                await self.worker
+            except asyncio.CancelledError:
+                pass
+            self.worker = None
+        # Les requêtes encore en attente ne recevront jamais de réponse
+        while self.queue is not None and not self.queue.empty():
+            _, future = self.queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("BERT batcher arrêté"))
+        if self.owns_executor:
+            self.executor.shutdown(wait=False)
+
+    async def predict(self, text):
+        """Soumet un texte nettoyé et attend la sortie du pipeline qui lui correspond."""
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((text, future))
+        return await future
+
+    async def _collect_batch(self):
+        loop = asyncio.get_running_loop()
+        batch = [await self.queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        # Les clients déconnectés entre-temps n'ont plus besoin de résultat
+        return [(text, future) for text, future in batch if not future.cancelled()]
+
+    def depth(self):
+        """Nombre de requêtes en attente d'un batch."""
+        return self.queue.qsize() if self.queue is not None else 0
+
+    def _forward(self, texts):
+        bert_pipeline = self.get_pipeline()
+        start = time.perf_counter()
+        if self.forward is not None:
+            outputs = self.forward(bert_pipeline, texts)
+        else:
+            # Le pipeline ajoute lui-même le padding lorsque batch_size > 1
+            outputs = bert_pipeline(texts, batch_size=len(texts), truncation=True)
+        if self.on_batch is not None:
+            self.on_batch(len(texts), time.perf_counter() - start)
+        return outputs
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect_batch()
+            if not batch:
+                continue
+            texts = [text for text, _ in batch]
+            try:
+                outputs = await loop.run_in_executor(self.executor, self._forward, texts)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future), output in zip(batch, outputs):
+                if not future.done():
+                    future.set_result(output)
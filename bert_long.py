@@ -0,0 +1,105 @@
+"""
+Évaluation BERT des articles longs par fenêtres glissantes.
+
+Au lieu de tronquer l'article à 512 tokens, le texte est tokenisé une seule
+fois puis découpé en fenêtres de 512 tokens qui se chevauchent. Les fenêtres
+de tous les documents d'une requête sont évaluées ensemble dans des batchs
+avec padding, puis les probabilités des fenêtres de chaque document sont
+combinées (moyenne, maximum ou moyenne pondérée par la longueur). Le coût est
+linéaire en la longueur de l'article, avec un nombre de fenêtres plafonné.
+"""
+
+import torch
+
+AGGREGATIONS = ("mean", "max", "length_weighted")
+
+
+def window_starts(n_tokens, content_size, stride, max_windows):
+    """
+    Débuts des fenêtres couvrant n_tokens tokens ; deux fenêtres consécutives
+    partagent `stride` tokens et la dernière est alignée sur la fin du texte.
+    Au-delà de max_windows, on garde des fenêtres réparties sur tout l'article.
+    """
+    step = max(content_size - stride, 1)
+    if n_tokens <= content_size:
+        return [0]
+    n_windows = 1 + -(-(n_tokens - content_size) // step)
+    starts = [min(i * step, n_tokens - content_size) for i in range(n_windows)]
+    if n_windows > max_windows:
+        if max_windows == 1:
+            return starts[:1]
+        keep = sorted({round(i * (n_windows - 1) / (max_windows - 1)) for i in range(max_windows)})
+        starts = [starts[i] for i in keep]
+    return starts
+
+
+def special_tokens(tokenizer):
+    """Tokens ajoutés autour de chaque fenêtre : [CLS] ... [SEP] pour BERT."""
+    start = tokenizer.cls_token_id if tokenizer.cls_token_id is not None else tokenizer.bos_token_id
+    end = tokenizer.sep_token_id if tokenizer.sep_token_id is not None else tokenizer.eos_token_id
+    return [start] if start is not None else [], [end] if end is not None else []
+
+
+def aggregate(probas, lengths, aggregation):
+    if aggregation == "max":
+        return max(probas)
+    if aggregation == "length_weighted":
+        total = sum(lengths)
+        if total:
+            return sum(p * n for p, n in zip(probas, lengths)) / total
+    return sum(probas) / len(probas)
+
+
+def score_long_documents(bert_pipeline, texts, window_tokens=512, stride=128, max_windows=16,
+                         aggregation="mean", max_windows_per_batch=32):
+    """
+    Évalue des textes (déjà nettoyés) avec le modèle et le tokenizer d'un
+    pipeline "text-classification". Renvoie, pour chaque texte, un dict au
+    format du pipeline ({"label", "score"}) complété du nombre de fenêtres.
+    """
+    if aggregation not in AGGREGATIONS:
+        raise ValueError(f"Agrégation inconnue : {aggregation} (valeurs possibles : {AGGREGATIONS})")
+    tokenizer = bert_pipeline.tokenizer
+    model = bert_pipeline.model
+    prefix, suffix = special_tokens(tokenizer)
+    content_size = window_tokens - len(prefix) - len(suffix)
+
+    # Une seule tokenisation par document, sans troncature
+    all_ids = tokenizer(list(texts), add_special_tokens=False, truncation=False, verbose=False)["input_ids"]
+    windows, owners, lengths = [], [], []
+    for document, ids in enumerate(all_ids):
+        for start in window_starts(len(ids), content_size, stride, max_windows):
+            chunk = ids[start:start + content_size]
+            windows.append(prefix + chunk + suffix)
+            owners.append(document)
+            lengths.append(len(chunk))
+
+    window_probas = []
+    with torch.inference_mode():
+        for start in range(0, len(windows), max_windows_per_batch):
+            batch = windows[start:start + max_windows_per_batch]
+            width = max(len(ids) for ids in batch)
+            input_ids = torch.full((len(batch), width), tokenizer.pad_token_id, dtype=torch.long)
+            attention_mask = torch.zeros((len(batch), width), dtype=torch.long)
+            for row, ids in enumerate(batch):
+                input_ids[row, :len(ids)] = torch.tensor(ids)
+                attention_mask[row, :len(ids)] = 1
+            logits = model(input_ids=input_ids.to(model.device), attention_mask=attention_mask.to(model.device)).logits
+            window_probas.extend(torch.softmax(logits, dim=-1)[:, 1].tolist())
+
+    per_document = [([], []) for _ in all_ids]
+    for document, proba, length in zip(owners, window_probas, lengths):
+        per_document[document][0].append(proba)
+        per_document[document][1].append(length)
+
+    id2label = model.config.id2label
+    results = []
+    for probas, window_lengths in per_document:
+        proba_fake = aggregate(probas, window_lengths, aggregation)
+        fake = proba_fake > 0.5
+        results.append({
+            "label": id2label[1 if fake else 0],
+            "score": proba_fake if fake else 1 - proba_fake,
+            "windows": len(probas),
+        })
+    return results
@@ -0,0 +1,145 @@
+"""
+Quantification dynamique INT8 du classifieur BERT pour l'inférence sur CPU.
+
+Les poids des couches Linear (l'essentiel du calcul de BERT) sont stockés en
+INT8 et les activations quantifiées à la volée ; aucun jeu de calibration
+n'est nécessaire. Le service l'active avec BERT_QUANTIZATION=int8.
+
+Lancé comme script, compare le modèle fp32 et le modèle INT8 sur la partie
+test du split de BERT_Classifier.py (quasi-doublons retirés, test_size=0.2,
+random_state=42) :
+exactitude, accord des prédictions, écart des probabilités, latence et
+mémoire, et enregistre le rapport en JSON.
+
+Exemple :
+    python bert_quantization.py --rows 500 --output results/bert_quantization_report.json
+"""
+
+import argparse
+import json
+import os
+import time
+
+import torch
+
+
+def quantize_dynamic_int8(model):
+    """Renvoie une copie du modèle PyTorch dont les couches Linear sont quantifiées en INT8."""
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def quantize_pipeline(bert_pipeline):
+    """Remplace le modèle d'un pipeline Hugging Face par sa version INT8 (sur CPU)."""
+    bert_pipeline.model = quantize_dynamic_int8(bert_pipeline.model.to("cpu").eval())
+    return bert_pipeline
+
+
+def current_rss_mb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def state_dict_mb(model):
+    """Taille des poids (y compris les poids INT8 empaquetés) en Mo."""
+    total = 0
+    for value in model.state_dict().values():
+        tensors = value if isinstance(value, tuple) else (value,)
+        total += sum(t.numel() * t.element_size() for t in tensors if isinstance(t, torch.Tensor))
+    return total / 1e6
+
+
+def evaluate(model, tokenizer, texts, labels, batch_size, max_length):
+    probas, latencies = [], []
+    with torch.inference_mode():
+        for start in range(0, len(texts), batch_size):
+            batch = texts[start:start + batch_size]
+            inputs = tokenizer(batch, padding=True, truncation=True, max_length=max_length, return_tensors="pt")
+            begin = time.perf_counter()
+            logits = model(**inputs).logits
+            latencies.append((time.perf_counter() - begin) / len(batch))
+            probas.append(torch.softmax(logits, dim=-1)[:, 1])
+    proba_fake = torch.cat(probas)
+    predictions = (proba_fake > 0.5).long()
+    accuracy = (predictions == torch.tensor(labels)).float().mean().item()
+    latencies_ms = sorted(latency * 1000 for latency in latencies)
+    return proba_fake, predictions, {
+        "accuracy": round(accuracy, 4),
+        "latency_ms_per_text_p50": round(latencies_ms[len(latencies_ms) // 2], 3),
+        "latency_ms_per_text_p95": round(latencies_ms[int(len(latencies_ms) * 0.95)], 3),
+    }
+
+
+def main():
+    import pandas as pd
+    from sklearn.model_selection import train_test_split
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    from dedup import drop_near_duplicates
+    from preprocess import clean_texts
+
+    parser = argparse.ArgumentParser(description="Comparaison BERT fp32 / INT8 dynamique")
+    parser.add_argument("--model", default="model/bert_fake_news")
+    parser.add_argument("--tokenizer", default="model/bert_tokenizer")
+    parser.add_argument("--data", default="data/all_news_cleaned.csv")
+    parser.add_argument("--rows", type=int, default=500, help="nombre d'articles de test évalués")
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--max-length", type=int, default=512)
+    parser.add_argument("--output", default="results/bert_quantization_report.json")
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.data)
+    df["text"] = clean_texts(df["text"], workers=None)
+    # Même split que BERT_Classifier.py : quasi-doublons retirés avant le découpage
+    df, _ = drop_near_duplicates(df, "text")
+    _, X_test, _, y_test = train_test_split(df["text"], df["label"], test_size=0.2, random_state=42)
+    texts, labels = list(X_test[:args.rows]), list(y_test[:args.rows])
+    print(f"{len(texts)} articles de test")
+
+    tokenizer_path = args.tokenizer if os.path.isdir(args.tokenizer) else args.model
+    tokenizer = AutoTokenizer.from_pretrained(tokenizer_path)
+
+    rss_before = current_rss_mb()
+    fp32_model = AutoModelForSequenceClassification.from_pretrained(args.model).eval()
+    rss_fp32 = current_rss_mb()
+    int8_model = quantize_dynamic_int8(fp32_model)
+    rss_int8 = current_rss_mb()
+
+    fp32_proba, fp32_pred, fp32_report = evaluate(fp32_model, tokenizer, texts, labels, args.batch_size, args.max_length)
+    int8_proba, int8_pred, int8_report = evaluate(int8_model, tokenizer, texts, labels, args.batch_size, args.max_length)
+
+    fp32_report["weights_mb"] = round(state_dict_mb(fp32_model), 1)
+    int8_report["weights_mb"] = round(state_dict_mb(int8_model), 1)
+    if rss_before is not None:
+        fp32_report["rss_increase_mb"] = round(rss_fp32 - rss_before, 1)
+        int8_report["rss_increase_mb"] = round(rss_int8 - rss_fp32, 1)
+    report = {
+        "model": args.model,
+        "rows": len(texts),
+        "batch_size": args.batch_size,
+        "torch_threads": torch.get_num_threads(),
+        "fp32": fp32_report,
+        "int8": int8_report,
+        "parity": {
+            "prediction_agreement": round((fp32_pred == int8_pred).float().mean().item(), 4),
+            "max_proba_diff": round((fp32_proba - int8_proba).abs().max().item(), 4),
+            "mean_proba_diff": round((fp32_proba - int8_proba).abs().mean().item(), 4),
+            "accuracy_delta": round(int8_report["accuracy"] - fp32_report["accuracy"], 4),
+        },
+        "speedup_p50": round(fp32_report["latency_ms_per_text_p50"] / int8_report["latency_ms_per_text_p50"], 2),
+    }
+    print(json.dumps(report, indent=2))
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Rapport enregistré dans '{args.output}'")
+
+
+if __name__ == "__main__":
+    main()
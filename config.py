@@ -0,0 +1,174 @@
+import os
+
+# Paramètres du service, surchargeables par variables d'environnement.
+
+
+def env_int(name, default):
+    return int(os.getenv(name, default))
+
+
+def env_float(name, default):
+    return float(os.getenv(name, default))
+
+
+def env_weights(name, default):
+    """Lit des poids au format "modele=poids,modele=poids"."""
+    weights = {}
+    for item in os.getenv(name, default).split(","):
+        if item.strip():
+            model, weight = item.split("=")
+            weights[model.strip()] = float(weight)
+    return weights
+
+
+# ========== Micro-batching BERT ==========
+# Nombre maximal de textes regroupés dans une seule passe avant du modèle
+BERT_MAX_BATCH_SIZE = env_int("BERT_MAX_BATCH_SIZE", 16)
+# Attente maximale (en millisecondes) pour compléter un batch
+BERT_MAX_WAIT_MS = env_float("BERT_MAX_WAIT_MS", 5)
+
+# ========== Articles longs (fenêtres glissantes BERT) ==========
+# Active par défaut le mode fenêtres glissantes pour model="bert" (surchargeable par requête)
+BERT_LONG_DOCUMENTS = os.getenv("BERT_LONG_DOCUMENTS", "0") == "1"
+# Taille d'une fenêtre en tokens (tokens spéciaux compris) et chevauchement entre fenêtres
+BERT_WINDOW_TOKENS = env_int("BERT_WINDOW_TOKENS", 512)
+BERT_WINDOW_STRIDE = env_int("BERT_WINDOW_STRIDE", 128)
+# Nombre maximal de fenêtres par article
+BERT_MAX_WINDOWS = env_int("BERT_MAX_WINDOWS", 16)
+# Combinaison des scores des fenêtres : "mean", "max" ou "length_weighted"
+BERT_WINDOW_AGGREGATION = os.getenv("BERT_WINDOW_AGGREGATION", "mean")
+# Nombre maximal de fenêtres par passe avant
+BERT_MAX_WINDOWS_PER_BATCH = env_int("BERT_MAX_WINDOWS_PER_BATCH", 32)
+
+# ========== Registre des modèles ==========
+# Modèle et tokenizer sauvegardés par BERT_Classifier.py, utilisés en priorité s'ils existent
+FINE_TUNED_BERT = "model/bert_fake_news"
+FINE_TUNED_BERT_TOKENIZER = "model/bert_tokenizer"
+BERT_MODEL = os.getenv("BERT_MODEL") or (FINE_TUNED_BERT if os.path.isdir(FINE_TUNED_BERT) else "bert-base-uncased")
+BERT_TOKENIZER = os.getenv("BERT_TOKENIZER") or (
+    FINE_TUNED_BERT_TOKENIZER
+    if BERT_MODEL == FINE_TUNED_BERT and os.path.isdir(FINE_TUNED_BERT_TOKENIZER) else None
+)
+MODEL_PATHS = {
+    "bert": BERT_MODEL,
+    "randomforest": "model/fake_news_random_forest_classifier.pkl",
+    "xgboost": "model/xgboost_fake_news.pkl",
+    "gradientboosting": "model/gradient_boosting_fake_news.pkl",
+    # Régression logistique entraînée avec SMOTE (script_data/train_model_SMOTE.py)
+    "logisticregression": "model/fake_news_classifier.pkl",
+    # Son TF-IDF est ajusté sur l'échantillon de 20 % du script : vocabulaire
+    # différent de celui du TF-IDF partagé par les arbres
+    "logreg_vectorizer": "model/logreg_tfidf_vectorizer.pkl",
+    # Entraînement hors mémoire (train_model_streaming.py) : SGD sur TF-IDF à hachage
+    "sgd": "model/sgd_hashing_fake_news.pkl",
+    "hashing_vectorizer": "model/hashing_tfidf_vectorizer.pkl",
+    "vectorizer": "model/tfidf_vectorizer.pkl",
+}
+# Quantification du modèle BERT servi : "none" (fp32) ou "int8" (quantification
+# dynamique INT8 des couches Linear, pour l'inférence sur CPU)
+BERT_QUANTIZATION = os.getenv("BERT_QUANTIZATION", "none")
+# Chargement hors ligne : "1" interdit l'accès au hub Hugging Face, "0" l'autorise,
+# "auto" l'interdit dès que le modèle BERT est un dossier local
+OFFLINE_MODELS = os.getenv("OFFLINE_MODELS", "auto")
+OFFLINE = OFFLINE_MODELS == "1" or (OFFLINE_MODELS == "auto" and os.path.isdir(BERT_MODEL))
+# Budget mémoire (en Mo) des modèles chargés ; 0 = pas de limite
+MODEL_MEMORY_BUDGET_MB = env_float("MODEL_MEMORY_BUDGET_MB", 0)
+# Modèles chargés (en parallèle) et testés par une inférence de warm-up dès le
+# démarrage, séparés par des virgules (ex: "vectorizer,randomforest")
+PRELOAD_MODELS = [name.strip() for name in os.getenv("PRELOAD_MODELS", "").split(",") if name.strip()]
+PRELOAD_PARALLEL = os.getenv("PRELOAD_PARALLEL", "1") == "1"
+# Intervalle (en secondes) de surveillance des artefacts des modèles chargés :
+# un fichier réentraîné est rechargé à chaud ; 0 désactive la surveillance
+MODEL_WATCH_INTERVAL = env_float("MODEL_WATCH_INTERVAL", 0)
+
+# ========== Contrôle d'admission ==========
+# Nombre maximal de requêtes /predict admises (en attente ou en cours) par
+# modèle, ex: BERT_MAX_QUEUE=128 ; au-delà, réponse 429 immédiate. 0 = sans limite
+MAX_QUEUE = {
+    "bert": env_int("BERT_MAX_QUEUE", 256),
+    "cascade": env_int("CASCADE_MAX_QUEUE", 1024),
+    "ensemble": env_int("ENSEMBLE_MAX_QUEUE", 1024),
+    "randomforest": env_int("RANDOMFOREST_MAX_QUEUE", 1024),
+    "xgboost": env_int("XGBOOST_MAX_QUEUE", 1024),
+    "gradientboosting": env_int("GRADIENTBOOSTING_MAX_QUEUE", 1024),
+    "logisticregression": env_int("LOGISTICREGRESSION_MAX_QUEUE", 1024),
+    "sgd": env_int("SGD_MAX_QUEUE", 1024),
+}
+# Limite par client (seau à jetons) : requêtes par seconde, 0 = désactivée
+RATE_LIMIT_PER_SECOND = env_float("RATE_LIMIT_PER_SECOND", 0)
+# Taille maximale d'une rafale de requêtes d'un même client
+RATE_LIMIT_BURST = env_float("RATE_LIMIT_BURST", 20)
+# En-tête identifiant le client ; à défaut, l'adresse IP est utilisée
+RATE_LIMIT_KEY_HEADER = os.getenv("RATE_LIMIT_KEY_HEADER", "X-API-Key")
+
+# ========== Regroupement des requêtes identiques ==========
+# "1" : les requêtes /predict identiques (même modèle, même texte nettoyé)
+# arrivées pendant un calcul en cours partagent son résultat
+COALESCE_REQUESTS = os.getenv("COALESCE_REQUESTS", "1") == "1"
+
+# ========== Cache des prédictions ==========
+# Nombre maximal d'entrées en mémoire ; 0 désactive le cache
+PREDICTION_CACHE_SIZE = env_int("PREDICTION_CACHE_SIZE", 10000)
+# Durée de vie d'une entrée, en secondes
+PREDICTION_CACHE_TTL = env_float("PREDICTION_CACHE_TTL", 3600)
+# Fichier SQLite du niveau disque (vide = cache en mémoire uniquement)
+PREDICTION_CACHE_DB = os.getenv("PREDICTION_CACHE_DB", "")
+
+# ========== Exécuteurs d'inférence ==========
+# Threads du pool partagé par les modèles scikit-learn/XGBoost
+TREE_EXECUTOR_THREADS = env_int("TREE_EXECUTOR_THREADS", os.cpu_count() or 4)
+# Threads dédiés aux passes avant de BERT
+BERT_EXECUTOR_THREADS = env_int("BERT_EXECUTOR_THREADS", 1)
+# Nombre maximal de requêtes en cours par modèle (ex: RANDOMFOREST_CONCURRENCY=8)
+MODEL_CONCURRENCY = {
+    "bert": env_int("BERT_CONCURRENCY", 64),
+    "randomforest": env_int("RANDOMFOREST_CONCURRENCY", TREE_EXECUTOR_THREADS),
+    "xgboost": env_int("XGBOOST_CONCURRENCY", TREE_EXECUTOR_THREADS),
+    "gradientboosting": env_int("GRADIENTBOOSTING_CONCURRENCY", TREE_EXECUTOR_THREADS),
+    "logisticregression": env_int("LOGISTICREGRESSION_CONCURRENCY", TREE_EXECUTOR_THREADS),
+    "sgd": env_int("SGD_CONCURRENCY", TREE_EXECUTOR_THREADS),
+}
+
+# ========== Mode ensemble ==========
+# Poids de chaque modèle TF-IDF dans la moyenne des probabilités du mode "ensemble"
+# (chaque modèle est évalué sur la sortie de son propre vectoriseur)
+ENSEMBLE_WEIGHTS = env_weights("ENSEMBLE_WEIGHTS", "randomforest=1,xgboost=1,gradientboosting=1")
+
+# ========== Mode cascade ==========
+# Modèle TF-IDF évalué en premier par le mode "cascade" (le plus rapide)
+CASCADE_FIRST_MODEL = os.getenv("CASCADE_FIRST_MODEL", "xgboost")
+# Bande d'incertitude sur la probabilité FAKE du premier modèle : dans
+# [CASCADE_BAND_LOW, CASCADE_BAND_HIGH], la décision est confiée à BERT
+# (valeurs proposées par tune_cascade.py)
+CASCADE_BAND_LOW = env_float("CASCADE_BAND_LOW", 0.3)
+CASCADE_BAND_HIGH = env_float("CASCADE_BAND_HIGH", 0.7)
+
+# ========== Moteur d'inférence des arbres ==========
+# "sklearn" : predict_proba de scikit-learn ; "compiled" : moteur vectorisé de
+# tree_engine.py pour RandomForest et GradientBoosting
+TREE_ENGINE = os.getenv("TREE_ENGINE", "sklearn")
+# Taille de batch au-delà de laquelle le moteur compilé délègue à scikit-learn
+TREE_ENGINE_MAX_BATCH = env_int("TREE_ENGINE_MAX_BATCH", 64)
+# "sparse" : régression logistique évaluée par le chemin rapide de
+# linear_engine.py (mêmes probabilités) ; "sklearn" : predict_proba de scikit-learn
+LINEAR_ENGINE = os.getenv("LINEAR_ENGINE", "sparse")
+
+# ========== Chargement des pickles ==========
+# mmap_mode passé à joblib.load ("r" pour projeter les tableaux NumPy en mémoire
+# partagée entre processus ; vide = chargement classique)
+JOBLIB_MMAP_MODE = os.getenv("JOBLIB_MMAP_MODE", "") or None
+
+# ========== Flux NDJSON ==========
+# Nombre de lignes traitées ensemble (une vectorisation par modèle et par bloc)
+NDJSON_CHUNK_SIZE = env_int("NDJSON_CHUNK_SIZE", 256)
+# Modèle utilisé pour les lignes sans champ "model"
+NDJSON_DEFAULT_MODEL = os.getenv("NDJSON_DEFAULT_MODEL", "randomforest")
+
+# ========== Déduplication du corpus d'entraînement ==========
+# Seuil de similarité de Jaccard (estimée par MinHash) au-delà duquel deux
+# articles sont des quasi-doublons ; 0 = pas de déduplication avant le split
+DEDUP_THRESHOLD = env_float("DEDUP_THRESHOLD", 0.8)
+# Nombre de permutations MinHash (précision de l'estimation)
+DEDUP_NUM_PERM = env_int("DEDUP_NUM_PERM", 128)
+# Taille des shingles (suites de mots consécutifs) comparés
+DEDUP_SHINGLE_SIZE = env_int("DEDUP_SHINGLE_SIZE", 5)
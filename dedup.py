@@ -0,0 +1,232 @@
+"""
+Suppression des quasi-doublons du corpus d'entraînement (MinHash + LSH).
+
+Les corpus fake/true et les articles scrapés contiennent de nombreuses copies
+presque identiques d'une même dépêche (reprises, titres ou signatures
+modifiés). drop_duplicates ne retire que les copies exactes : les autres
+allongent l'entraînement et se retrouvent des deux côtés du split
+train/test, ce qui surestime l'exactitude.
+
+Chaque texte est réduit à une signature MinHash de ses shingles (suites de
+DEDUP_SHINGLE_SIZE mots) : la proportion de valeurs égales entre deux
+signatures estime la similarité de Jaccard des deux textes. Les signatures
+sont découpées en bandes (LSH) : deux textes ne sont comparés que s'ils
+partagent au moins une bande identique, ce qui rend la recherche à peu près
+linéaire. Les signatures sont calculées sur plusieurs processus.
+
+Les textes sont parcourus dans l'ordre : le premier de chaque groupe est
+gardé, les suivants dont la similarité estimée avec lui dépasse le seuil sont
+retirés. Le rapport JSON liste chaque groupe (ligne gardée, lignes retirées,
+similarités, labels).
+
+Exemple :
+    python dedup.py --threshold 0.8 --output data/all_news_dedup.csv --report results/dedup_report.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+
+import config
+from preprocess import clean_texts
+
+# Nombre premier de Mersenne 2^31 - 1 : a * x + b tient dans un uint64
+_PRIME = np.uint64((1 << 31) - 1)
+
+
+class MinHasher:
+    """Signatures MinHash (num_perm valeurs uint32) des shingles de mots d'un texte."""
+
+    def __init__(self, num_perm=128, shingle_size=5, seed=42):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.RandomState(seed)
+        self.a = rng.randint(1, (1 << 31) - 1, size=num_perm).astype(np.uint64)
+        self.b = rng.randint(0, (1 << 31) - 1, size=num_perm).astype(np.uint64)
+
+    def shingles(self, text):
+        """Hachages des suites de shingle_size mots (le texte entier s'il est plus court)."""
+        words = np.fromiter((zlib.crc32(word.encode()) for word in str(text).split()), dtype=np.uint64)
+        if words.size == 0:
+            return words
+        size = min(self.shingle_size, words.size)
+        count = words.size - size + 1
+        hashes = np.zeros(count, dtype=np.uint64)
+        for offset in range(size):
+            # Les dépassements d'uint64 sont voulus (arithmétique modulo 2^64)
+            hashes = hashes * np.uint64(1000003) ^ words[offset:offset + count]
+        return np.unique(hashes % _PRIME)
+
+    def signature(self, text):
+        shingles = self.shingles(text)
+        if shingles.size == 0:
+            return np.full(self.num_perm, _PRIME, dtype=np.uint32)
+        hashed = (self.a[:, None] * shingles[None, :] + self.b[:, None]) % _PRIME
+        return hashed.min(axis=1).astype(np.uint32)
+
+    def signatures(self, texts):
+        signatures = np.empty((len(texts), self.num_perm), dtype=np.uint32)
+        for row, text in enumerate(texts):
+            signatures[row] = self.signature(text)
+        return signatures
+
+    def signatures_parallel(self, texts, workers=None, chunksize=1000):
+        """Signatures de tous les textes, par paquets de chunksize sur `workers` processus."""
+        texts = list(texts)
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers > 1 and len(texts) > chunksize and "fork" in multiprocessing.get_all_start_methods():
+            chunks = [texts[start:start + chunksize] for start in range(0, len(texts), chunksize)]
+            with multiprocessing.get_context("fork").Pool(workers) as pool:
+                return np.concatenate(pool.map(self.signatures, chunks))
+        return self.signatures(texts)
+
+
+def lsh_bands(threshold, num_perm):
+    """
+    Nombre de bandes et de lignes par bande (bandes × lignes <= num_perm) qui
+    minimisent la somme des faux positifs et des faux négatifs attendus autour
+    du seuil : la probabilité que deux textes de similarité s partagent une
+    bande vaut 1 - (1 - s^lignes)^bandes.
+    """
+    grid = np.linspace(0, 1, 201)
+    step = grid[1] - grid[0]
+    best = None
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        candidate = 1 - (1 - grid ** rows) ** bands
+        false_positive = candidate[grid < threshold].sum() * step
+        false_negative = (1 - candidate[grid >= threshold]).sum() * step
+        error = false_positive + false_negative
+        if best is None or error < best[0]:
+            best = (error, bands, rows)
+    return best[1], best[2]
+
+
+class LSHIndex:
+    """Index LSH des signatures des textes gardés."""
+
+    def __init__(self, threshold, num_perm):
+        self.threshold = threshold
+        self.bands, self.rows = lsh_bands(threshold, num_perm)
+        self.buckets = [{} for _ in range(self.bands)]
+        self.signatures = {}
+
+    def _keys(self, signature):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def query(self, signature):
+        """(identifiant, similarité) du texte indexé le plus proche au-delà du seuil, sinon None."""
+        candidates = set()
+        for band, key in self._keys(signature):
+            candidates.update(self.buckets[band].get(key, ()))
+        best = None
+        for candidate in candidates:
+            similarity = float(np.mean(self.signatures[candidate] == signature))
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (candidate, similarity)
+        return best
+
+    def insert(self, identifier, signature):
+        self.signatures[identifier] = signature
+        for band, key in self._keys(signature):
+            self.buckets[band].setdefault(key, []).append(identifier)
+
+
+def find_near_duplicates(texts, threshold=config.DEDUP_THRESHOLD, num_perm=config.DEDUP_NUM_PERM,
+                         shingle_size=config.DEDUP_SHINGLE_SIZE, workers=None, seed=42):
+    """
+    Masque des textes gardés et groupes de quasi-doublons
+    {position gardée: [(position retirée, similarité), ...]}.
+    """
+    signatures = MinHasher(num_perm, shingle_size, seed).signatures_parallel(texts, workers=workers)
+    index = LSHIndex(threshold, num_perm)
+    keep = np.ones(len(signatures), dtype=bool)
+    clusters = {}
+    for position, signature in enumerate(signatures):
+        match = index.query(signature)
+        if match is None:
+            index.insert(position, signature)
+        else:
+            keep[position] = False
+            clusters.setdefault(match[0], []).append((position, match[1]))
+    return keep, clusters
+
+
+def drop_near_duplicates(df, column="text", threshold=config.DEDUP_THRESHOLD, num_perm=config.DEDUP_NUM_PERM,
+                         shingle_size=config.DEDUP_SHINGLE_SIZE, workers=None, report_path=None):
+    """
+    Retire les quasi-doublons de df (comparés sur `column`, déjà nettoyée) et
+    renvoie (df filtré, rapport). threshold <= 0 désactive la déduplication.
+    """
+    if not threshold or threshold <= 0:
+        return df, None
+    start = time.perf_counter()
+    keep, clusters = find_near_duplicates(df[column].tolist(), threshold, num_perm, shingle_size, workers)
+    labels = df["label"].tolist() if "label" in df.columns else None
+    report = {
+        "threshold": threshold,
+        "num_perm": num_perm,
+        "shingle_size": shingle_size,
+        "documents": int(len(df)),
+        "dropped": int((~keep).sum()),
+        "clusters": [
+            {
+                "kept": _row(df.index[kept]),
+                "dropped": [{"row": _row(df.index[position]), "similarity": round(similarity, 3)}
+                            for position, similarity in members],
+                "labels": sorted({labels[position] for position in [kept] + [p for p, _ in members]})
+                if labels is not None else None,
+                "excerpt": str(df[column].iloc[kept])[:120],
+            }
+            for kept, members in sorted(clusters.items(), key=lambda item: -len(item[1]))
+        ],
+    }
+    conflicts = sum(1 for cluster in report["clusters"] if cluster["labels"] and len(cluster["labels"]) > 1)
+    print(f"Déduplication : {report['dropped']} quasi-doublons retirés sur {report['documents']} textes "
+          f"({len(clusters)} groupes, {conflicts} avec des labels différents) en {time.perf_counter() - start:.1f}s")
+    if report_path:
+        os.makedirs(os.path.dirname(report_path) or ".", exist_ok=True)
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False, default=str)
+        print(f"Rapport des groupes retirés : {report_path}")
+    return df[keep], report
+
+
+def _row(label):
+    return label.item() if isinstance(label, np.generic) else label
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suppression des quasi-doublons d'un corpus (MinHash + LSH)")
+    parser.add_argument("--data", default="data/all_news_cleaned.csv")
+    parser.add_argument("--column", default="text", help="colonne comparée (nettoyée avec clean_text)")
+    parser.add_argument("--threshold", type=float, default=config.DEDUP_THRESHOLD or 0.8,
+                        help="similarité de Jaccard minimale des quasi-doublons")
+    parser.add_argument("--num-perm", type=int, default=config.DEDUP_NUM_PERM)
+    parser.add_argument("--shingle-size", type=int, default=config.DEDUP_SHINGLE_SIZE)
+    parser.add_argument("--workers", type=int, default=None, help="processus de calcul des signatures (défaut : tous les cœurs)")
+    parser.add_argument("--output", help="CSV dédupliqué (par défaut : rapport seulement)")
+    parser.add_argument("--report", default="results/dedup_report.json")
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.data)
+    df.columns = df.columns.str.strip()
+    df["cleaned"] = clean_texts(df[args.column], workers=args.workers)
+    kept, _ = drop_near_duplicates(
+        df, "cleaned", args.threshold, args.num_perm, args.shingle_size, args.workers, args.report)
+    if args.output:
+        kept = kept.drop(columns="cleaned")
+        kept.to_csv(args.output, index=False)
+        print(f"{len(kept)} lignes écrites dans {args.output}")
+
+
+if __name__ == "__main__":
+    main()
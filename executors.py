@@ -0,0 +1,43 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+
+class InferenceExecutors:
+    """
+    Exécuteurs dédiés à l'inférence, pour que les modèles ne se partagent plus
+    le threadpool par défaut de FastAPI.
+
+    - un pool de threads borné pour scikit-learn/XGBoost (qui relâchent le GIL
+      pendant les calculs),
+    - un pool séparé pour BERT, utilisé par le micro-batcher,
+    - une limite de concurrence par modèle (sémaphore asyncio) : une rafale de
+      requêtes BERT attend sur son propre sémaphore et n'occupe pas les
+      threads des modèles à base d'arbres.
+    """
+
+    def __init__(self, tree_threads, bert_threads, concurrency_limits):
+        self.tree_pool = ThreadPoolExecutor(max_workers=tree_threads, thread_name_prefix="tree-inference")
+        self.bert_pool = ThreadPoolExecutor(max_workers=bert_threads, thread_name_prefix="bert-inference")
+        self.limits = dict(concurrency_limits)
+        self.semaphores = {name: asyncio.Semaphore(limit) for name, limit in self.limits.items()}
+
+    def pool_for(self, model_name):
+        return self.bert_pool if model_name == "bert" else self.tree_pool
+
+    def limit(self, model_name):
+        """Sémaphore à utiliser avec `async with` autour d'un appel au modèle."""
+        return self.semaphores[model_name]
+
+    async def run(self, model_name, fn, *args, **kwargs):
+        """Exécute fn dans le pool du modèle, dans la limite de concurrence du modèle."""
+        async with self.semaphores[model_name]:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.pool_for(model_name), functools.partial(fn, *args, **kwargs))
+
+    def in_flight(self):
+        return {name: self.limits[name] - semaphore._value for name, semaphore in self.semaphores.items()}
+
+    def shutdown(self):
+        self.tree_pool.shutdown(wait=False)
+        self.bert_pool.shutdown(wait=False)
@@ -0,0 +1,164 @@
+"""
+Cache des caractéristiques d'entraînement partagé par les scripts d'entraînement.
+
+Chargement du CSV, nettoyage (clean_texts), retrait des quasi-doublons
+(dedup.py), split train/test et TF-IDF sont
+identiques d'un modèle à l'autre : ils sont calculés une fois puis relus par
+les entraînements suivants, qui passent directement à l'apprentissage.
+
+L'entrée du cache est adressée par son contenu : la clé est un hachage du
+contenu du CSV, de la version du nettoyage (preprocess.CLEANING_VERSION), des
+paramètres de la déduplication et du vectoriseur, du split (test_size, random_state, sample_frac) et
+de la version de scikit-learn. Modifier l'un d'eux crée une nouvelle entrée ;
+les anciennes peuvent être supprimées sans risque (dossier cache/features).
+
+Contenu d'une entrée (cache/features/<clé>/) :
+    texts.pkl        textes nettoyés et labels, train et test (Series pandas)
+    vectorizer.pkl   TfidfVectorizer ajusté sur le train
+    features/        matrices TF-IDF CSR train et test (feature_store.py),
+                     projetées en mémoire à la relecture, sans copie
+    dedup_report.json   groupes de quasi-doublons retirés avant le split
+    manifest.json    paramètres de la clé, tailles, date de création
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from collections import namedtuple
+
+import joblib
+import pandas as pd
+import sklearn
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.model_selection import train_test_split
+
+import config
+import feature_store
+from dedup import drop_near_duplicates
+from preprocess import CLEANING_VERSION, clean_texts
+
+CACHE_DIR = "cache/features"
+DEFAULT_VECTORIZER_PARAMS = {"stop_words": "english", "max_features": 10000}
+
+Features = namedtuple("Features", [
+    "texts_train", "texts_test", "y_train", "y_test", "X_train", "X_test", "vectorizer", "key", "hit"])
+
+
+def file_digest(path, cache_dir=CACHE_DIR):
+    """
+    SHA-256 du contenu du fichier. Le résultat est mémorisé par (chemin, taille,
+    date de modification) : le CSV n'est relu que s'il a changé.
+    """
+    stat = os.stat(path)
+    marker = f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}"
+    index_path = os.path.join(cache_dir, "digests.json")
+    try:
+        with open(index_path) as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        index = {}
+    if marker in index:
+        return index[marker]
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    index[marker] = digest.hexdigest()
+    os.makedirs(cache_dir, exist_ok=True)
+    _write_json(index_path, index)
+    return index[marker]
+
+
+def cache_key(data_digest, vectorizer_params, test_size, random_state, sample_frac, dedup_threshold):
+    params = {
+        "data": data_digest,
+        "cleaning_version": CLEANING_VERSION,
+        "dedup": [dedup_threshold, config.DEDUP_NUM_PERM, config.DEDUP_SHINGLE_SIZE] if dedup_threshold else None,
+        "vectorizer": vectorizer_params,
+        "test_size": test_size,
+        "random_state": random_state,
+        "sample_frac": sample_frac,
+        "sklearn": sklearn.__version__,
+        "store": feature_store.FORMAT_VERSION,
+    }
+    encoded = json.dumps(params, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()[:16], params
+
+
+def load_features(csv_path="data/all_news_cleaned.csv", test_size=0.2, random_state=42, sample_frac=None,
+                  vectorizer_params=None, cache_dir=CACHE_DIR, workers=None, dedup_threshold=config.DEDUP_THRESHOLD):
+    """
+    Textes nettoyés, labels et matrices TF-IDF train/test du CSV, avec le
+    vectoriseur ajusté. Relus depuis le cache s'ils existent, sinon calculés
+    comme dans les scripts d'entraînement puis enregistrés. Les quasi-doublons
+    (similarité >= dedup_threshold, 0 = aucun retrait) sont retirés avant le split.
+    """
+    vectorizer_params = dict(DEFAULT_VECTORIZER_PARAMS if vectorizer_params is None else vectorizer_params)
+    key, params = cache_key(
+        file_digest(csv_path, cache_dir), vectorizer_params, test_size, random_state, sample_frac, dedup_threshold)
+    entry = os.path.join(cache_dir, key)
+
+    if os.path.exists(os.path.join(entry, "manifest.json")):
+        start = time.perf_counter()
+        texts_train, texts_test, y_train, y_test = joblib.load(os.path.join(entry, "texts.pkl"))
+        vectorizer = joblib.load(os.path.join(entry, "vectorizer.pkl"))
+        split = feature_store.open_split(os.path.join(entry, "features"))
+        X_train, X_test = split["train"].csr(), split["test"].csr()
+        print(f"Caractéristiques relues depuis le cache {entry} en {time.perf_counter() - start:.1f}s")
+        return Features(texts_train, texts_test, y_train, y_test, X_train, X_test, vectorizer, key, True)
+
+    start = time.perf_counter()
+    df = pd.read_csv(csv_path)
+    df.columns = df.columns.str.strip()
+    if sample_frac is not None:
+        df = df.sample(frac=sample_frac, random_state=random_state)
+    df['text'] = clean_texts(df['text'], workers=workers)
+    df, dedup_report = drop_near_duplicates(df, 'text', dedup_threshold, workers=workers)
+    texts_train, texts_test, y_train, y_test = train_test_split(
+        df['text'], df['label'], test_size=test_size, random_state=random_state)
+    vectorizer = TfidfVectorizer(**vectorizer_params)
+    X_train = vectorizer.fit_transform(texts_train)
+    X_test = vectorizer.transform(texts_test)
+    elapsed = time.perf_counter() - start
+
+    # Écriture dans un dossier temporaire puis renommage : un entraînement
+    # interrompu ou concurrent ne laisse jamais d'entrée incomplète
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = tempfile.mkdtemp(prefix=f".{key}-", dir=cache_dir)
+    try:
+        joblib.dump((texts_train, texts_test, y_train, y_test), os.path.join(tmp, "texts.pkl"))
+        joblib.dump(vectorizer, os.path.join(tmp, "vectorizer.pkl"))
+        if dedup_report is not None:
+            _write_json(os.path.join(tmp, "dedup_report.json"), dedup_report)
+        # Valeurs gardées en float64 : mêmes matrices qu'un calcul sans cache
+        feature_store.save_split(os.path.join(tmp, "features"), {
+            "train": (X_train, y_train), "test": (X_test, y_test)}, dtype=None)
+        _write_json(os.path.join(tmp, "manifest.json"), {
+            **params,
+            "csv_path": csv_path,
+            "shape_train": list(X_train.shape),
+            "shape_test": list(X_test.shape),
+            "build_seconds": round(elapsed, 2),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        })
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    try:
+        os.rename(tmp, entry)
+    except OSError:
+        # Entrée déjà créée par un autre entraînement entre-temps
+        shutil.rmtree(tmp, ignore_errors=True)
+    print(f"Caractéristiques calculées en {elapsed:.1f}s et mises en cache dans {entry}")
+    return Features(texts_train, texts_test, y_train, y_test, X_train, X_test, vectorizer, key, False)
+
+
+def _write_json(path, payload):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(payload, f, indent=2)
+    os.replace(tmp, path)
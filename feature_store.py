@@ -0,0 +1,136 @@
+"""
+Stockage des matrices TF-IDF (CSR) projetables en mémoire.
+
+Chaque partie d'un jeu de données (train, test...) est enregistrée sous forme
+de tableaux .npy bruts — data, indices, indptr de la matrice CSR et labels —
+décrits par un petit manifest.json. À l'ouverture, les tableaux sont projetés
+en mémoire (np.load(mmap_mode='r')) : rien n'est désérialisé ni copié, le
+système ne lit que les pages réellement utilisées. Ouvrir un split de
+plusieurs Go prend quelques millisecondes, contre une désérialisation
+complète avec joblib/pickle.
+
+Les valeurs peuvent être stockées en float32 (moitié moins de disque et de
+mémoire) ; les consommateurs par mini-lots lisent une plage de lignes avec
+rows() ou batches() sans charger le reste de la matrice.
+
+Exemple :
+    save_split("model/tfidf_data_split", {"train": (X_train, y_train), "test": (X_test, y_test)})
+    split = open_split("model/tfidf_data_split")
+    for X, y in split["train"].batches(10000):
+        clf.partial_fit(X, y, classes=[0, 1])
+"""
+
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import scipy.sparse as sp
+
+FORMAT_VERSION = 1
+ARRAYS = ("data", "indices", "indptr", "labels")
+
+
+class MappedCSR:
+    """Matrice CSR et labels d'une partie du split, projetés en mémoire (lecture seule)."""
+
+    def __init__(self, directory, name, shape):
+        self.name = name
+        self.shape = tuple(shape)
+        arrays = {array: np.load(os.path.join(directory, f"{name}_{array}.npy"), mmap_mode="r")
+                  for array in ARRAYS}
+        self.data = arrays["data"]
+        self.indices = arrays["indices"]
+        self.indptr = arrays["indptr"]
+        self.labels = arrays["labels"]
+
+    def __len__(self):
+        return self.shape[0]
+
+    @property
+    def nnz(self):
+        return int(self.indptr[-1])
+
+    @property
+    def dtype(self):
+        return self.data.dtype
+
+    def csr(self):
+        """Matrice complète, sans copie : ses tableaux restent projetés depuis le disque."""
+        return sp.csr_matrix((self.data, self.indices, self.indptr), shape=self.shape, copy=False)
+
+    def rows(self, start, stop):
+        """Lignes [start, stop) : seul indptr (stop - start + 1 entiers) est recopié."""
+        start, stop, _ = slice(start, stop).indices(self.shape[0])
+        stop = max(start, stop)
+        first, last = int(self.indptr[start]), int(self.indptr[stop])
+        indptr = np.asarray(self.indptr[start:stop + 1]) - first
+        return sp.csr_matrix(
+            (self.data[first:last], self.indices[first:last], indptr),
+            shape=(stop - start, self.shape[1]), copy=False)
+
+    def batches(self, batch_size):
+        """Mini-lots (X, y) successifs de batch_size lignes."""
+        for start in range(0, self.shape[0], batch_size):
+            stop = min(start + batch_size, self.shape[0])
+            yield self.rows(start, stop), self.labels[start:stop]
+
+
+def save_split(directory, parts, dtype=np.float32):
+    """
+    Enregistre les parties {nom: (X, y)} dans directory, qui est remplacé s'il
+    existe. Les valeurs de X sont converties en dtype (None : type d'origine).
+    """
+    parent = os.path.dirname(os.path.abspath(directory))
+    os.makedirs(parent, exist_ok=True)
+    # Écriture dans un dossier temporaire puis renommage : un lecteur ne voit
+    # jamais un split à moitié écrit
+    tmp = tempfile.mkdtemp(prefix=f".{os.path.basename(directory)}-", dir=parent)
+    manifest = {"format": FORMAT_VERSION, "parts": {}}
+    try:
+        for name, (X, y) in parts.items():
+            X = sp.csr_matrix(X)
+            labels = np.asarray(y)
+            if labels.shape[0] != X.shape[0]:
+                raise ValueError(f"{name} : {X.shape[0]} lignes mais {labels.shape[0]} labels")
+            # Même type pour indices et indptr, sinon scipy les recopie à l'ouverture
+            index_dtype = np.result_type(X.indices.dtype, X.indptr.dtype)
+            arrays = {
+                "data": X.data if dtype is None else X.data.astype(dtype, copy=False),
+                "indices": X.indices.astype(index_dtype, copy=False),
+                "indptr": X.indptr.astype(index_dtype, copy=False),
+                "labels": labels,
+            }
+            for array, values in arrays.items():
+                np.save(os.path.join(tmp, f"{name}_{array}.npy"), values, allow_pickle=False)
+            manifest["parts"][name] = {
+                "shape": list(X.shape),
+                "nnz": int(X.nnz),
+                "dtype": str(arrays["data"].dtype),
+                "index_dtype": str(index_dtype),
+                "label_dtype": str(labels.dtype),
+            }
+        with open(os.path.join(tmp, "manifest.json"), "w") as f:
+            json.dump(manifest, f, indent=2)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+
+    if os.path.exists(directory):
+        old = f"{tmp}.old"
+        os.rename(directory, old)
+        os.rename(tmp, directory)
+        shutil.rmtree(old, ignore_errors=True)
+    else:
+        os.rename(tmp, directory)
+    return manifest
+
+
+def open_split(directory):
+    """Parties du split {nom: MappedCSR}, projetées en mémoire."""
+    with open(os.path.join(directory, "manifest.json")) as f:
+        manifest = json.load(f)
+    if manifest.get("format") != FORMAT_VERSION:
+        raise ValueError(f"{directory} : format {manifest.get('format')} non pris en charge")
+    return {name: MappedCSR(directory, name, part["shape"]) for name, part in manifest["parts"].items()}
@@ -0,0 +1,48 @@
+"""
+Vectoriseur TF-IDF à hachage, entraînable par morceaux.
+
+Contrairement à TfidfVectorizer, aucun vocabulaire n'est stocké : chaque mot
+est haché dans un espace de taille fixe (HashingVectorizer, sans état). Seules
+les fréquences documentaires sont accumulées au fil des morceaux du corpus
+(partial_fit), la mémoire est donc la même quelle que soit la taille du corpus.
+La pondération reproduit celle de TfidfVectorizer par défaut : idf lissé
+(log((1 + n) / (1 + df)) + 1) puis normalisation L2 de chaque ligne.
+"""
+
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+
+
+class HashingTfidfVectorizer:
+
+    def __init__(self, n_features=2 ** 20, stop_words="english"):
+        self.n_features = n_features
+        self.hashing = HashingVectorizer(
+            n_features=n_features, stop_words=stop_words, alternate_sign=False, norm=None)
+        self.n_documents = 0
+        self.document_frequency = np.zeros(n_features, dtype=np.int64)
+        self.idf_ = None
+
+    def partial_fit(self, texts):
+        """Ajoute les fréquences documentaires d'un morceau du corpus."""
+        counts = self.hashing.transform(texts)
+        # Une ligne CSR du HashingVectorizer contient chaque colonne au plus une fois
+        self.document_frequency += np.bincount(counts.indices, minlength=self.n_features)
+        self.n_documents += counts.shape[0]
+        self.idf_ = None
+        return self
+
+    def idf(self):
+        if self.idf_ is None:
+            self.idf_ = np.log((1 + self.n_documents) / (1 + self.document_frequency)) + 1
+        return self.idf_
+
+    def transform(self, texts):
+        X = self.hashing.transform(texts)
+        X.data *= self.idf()[X.indices]
+        return normalize(X, norm="l2", copy=False)
+
+    @property
+    def nbytes(self):
+        return self.document_frequency.nbytes + (self.idf_.nbytes if self.idf_ is not None else 0)
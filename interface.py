@@ -1,7 +1,6 @@
 import streamlit as st
 import joblib
 import requests
-import re  # Import ajouté pour le nettoyage du texte
 
 # Charger le vectorizer TF-IDF
 vectorizer = joblib.load('model/tfidf_vectorizer.pkl')
@@ -12,13 +11,6 @@ st.write("Entrez un texte pour savoir s'il est Fake ou Non-Fake.")
 # Interface utilisateur : champ de texte
 user_input = st.text_area("Texte à analyser", "")
 
-# Fonction de nettoyage du texte
-def clean_text(text):
-    text = text.lower()
-    text = re.sub(r"http\S+", "", text)  # Supprime les URLs
-    text = re.sub(r"[^a-zA-Z\s]", "", text)  # Conserve uniquement les lettres et les espaces
-    return text
-
 # Fonction pour prédire le texte via l'API FastAPI
 def predict(text, model_choice):
     url = "http://127.0.0.1:8000/predict"
@@ -39,9 +31,8 @@ model_choice = st.selectbox("Choisissez le modèle de détection", ["randomfores
 # Affichage des résultats
 if st.button("Analyser"):
     if user_input.strip():
-        # Nettoyage du texte avant de l'envoyer à l'API
-        cleaned_input = clean_text(user_input)
-        result = predict(cleaned_input, model_choice)
+        # Le texte est envoyé brut : l'API se charge du nettoyage
+        result = predict(user_input, model_choice)
         if "prediction" in result:
             st.success(f"Résultat de l'analyse : **{result['prediction']}**")
             st.write(f"Confiance : FAKE = {result['probabilities']['FAKE']}% | REAL = {result['probabilities']['REAL']}%")
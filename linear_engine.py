@@ -0,0 +1,59 @@
+"""
+Chemin rapide pour la régression logistique sur TF-IDF (model/fake_news_classifier.pkl).
+
+predict_proba de scikit-learn revalide la matrice à chaque appel (type, forme,
+valeurs finies, format CSR) avant de calculer le produit scalaire ; pour une
+seule ligne, cette validation coûte plus cher que le calcul. Ici le score est
+calculé directement sur les tableaux CSR du vectoriseur (produit creux
+ligne · coefficients + intercept), avec les mêmes opérations et dans le même
+ordre que scikit-learn : les probabilités sont identiques, bit pour bit.
+"""
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.special import expit
+
+
+class SparseLogisticRegression:
+    """predict_proba sans validation pour une régression logistique binaire entraînée."""
+
+    def __init__(self, model):
+        self.model = model
+        self.classes_ = model.classes_
+        # Même forme que dans LinearClassifierMixin.decision_function : (n_features, 1)
+        self.coef_T = np.ascontiguousarray(model.coef_.T)
+        self.intercept = model.intercept_
+        self.n_features = model.coef_.shape[1]
+
+    def decision_function(self, X):
+        if not sp.isspmatrix_csr(X):
+            X = sp.csr_matrix(X)
+        if X.shape[1] != self.n_features:
+            raise ValueError(f"X a {X.shape[1]} colonnes, le modèle en attend {self.n_features}")
+        # Produit creux × dense de scipy : une boucle C sur data/indices/indptr de chaque ligne
+        scores = X @ self.coef_T + self.intercept
+        return scores.reshape(-1)
+
+    def predict_proba(self, X):
+        prob = self.decision_function(X)
+        prob = expit(prob, out=prob)
+        return np.stack([1 - prob, prob], axis=1)
+
+    def predict(self, X):
+        return self.classes_[(self.decision_function(X) > 0).astype(int)]
+
+    @property
+    def nbytes(self):
+        return self.coef_T.nbytes + self.intercept.nbytes
+
+
+def compile_linear(model):
+    """
+    Chemin rapide pour une régression logistique binaire (LogisticRegression ou
+    SGDClassifier avec la perte logistique) ; les autres modèles sont renvoyés tels quels.
+    """
+    kind = type(model).__name__
+    logistic = kind == "LogisticRegression" or (kind == "SGDClassifier" and model.loss in ("log_loss", "log"))
+    if logistic and len(model.classes_) == 2:
+        return SparseLogisticRegression(model)
+    return model
@@ -0,0 +1,308 @@
+"""
+Test de charge de l'endpoint /predict : latence (p50/p95/p99), débit et taux
+d'erreur par modèle, au format JSON.
+
+Les textes sont rejoués depuis data/all_news_cleaned.csv (colonne "text") ou
+depuis un fichier .jsonl. L'api est soit lancée dans le même processus
+(TestClient, aucun serveur nécessaire), soit un serveur uvicorn déjà démarré
+(--url). Chaque client virtuel envoie une requête, attend la réponse puis
+envoie la suivante : --concurrency fixe le nombre de requêtes en vol.
+Les textes étant rejoués en boucle, --no-cache désactive le cache des
+prédictions de l'api lancée dans le processus (pour un serveur uvicorn, le
+lancer avec PREDICTION_CACHE_SIZE=0).
+
+Le rapport JSON est écrit dans --output, sinon seul sur la sortie standard :
+les messages de l'api lancée dans le processus (démarrage, chargement des
+modèles) et ceux du test sont envoyés sur la sortie d'erreur.
+
+Exemples :
+    python load_test.py run --concurrency 16 --requests 2000 --mix randomforest=3,xgboost=1 --output results/avant.json
+    python load_test.py run --url http://127.0.0.1:8000 --source data/articles.jsonl --duration 60 --mix bert=1
+    python load_test.py compare results/avant.json results/apres.json --max-regression 10
+"""
+
+import argparse
+import contextlib
+import itertools
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+
+def load_texts(source, text_field, limit):
+    """Textes à rejouer (et modèle imposé par la ligne pour un .jsonl, sinon None)."""
+    if source.endswith(".jsonl"):
+        samples = []
+        with open(source, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    samples.append((str(record.get(text_field, "")), record.get("model")))
+                if limit and len(samples) >= limit:
+                    break
+        return samples
+    df = pd.read_csv(source, usecols=[text_field], nrows=limit or None)
+    return [(str(text), None) for text in df[text_field].fillna("")]
+
+
+def parse_mix(mix):
+    """Mélange de modèles au format "modele=poids,modele=poids"."""
+    weights = {}
+    for item in mix.split(","):
+        if item.strip():
+            model, _, weight = item.partition("=")
+            weights[model.strip()] = float(weight or 1)
+    return weights
+
+
+def request_plan(samples, mix, seed):
+    """Suite infinie de requêtes (texte, modèle) : textes en boucle, modèles tirés selon le mélange."""
+    rng = random.Random(seed)
+    models, weights = list(mix), list(mix.values())
+    for text, model in itertools.cycle(samples):
+        yield text, model or rng.choices(models, weights)[0]
+
+
+class Client:
+    """Envoi d'une requête POST /predict, en local (TestClient) ou via HTTP."""
+
+    def __init__(self, url, no_cache=False):
+        self.url = url
+        if url:
+            import requests
+            self.session = requests.Session()
+        else:
+            # La configuration est lue à l'import de main
+            if no_cache:
+                os.environ["PREDICTION_CACHE_SIZE"] = "0"
+            from fastapi.testclient import TestClient
+            import main
+            self.session = TestClient(main.app)
+
+    def __enter__(self):
+        if not self.url:
+            self.session.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        if not self.url:
+            self.session.__exit__(*exc)
+        self.session.close()
+
+    def get(self, path):
+        return self.session.get((self.url or "") + path)
+
+    def predict(self, text, model):
+        response = self.session.post((self.url or "") + "/predict", json={"text": text, "model": model})
+        return response.status_code == 200 and "error" not in response.json()
+
+    def wait_ready(self, timeout):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            try:
+                if self.get("/health/ready").status_code == 200:
+                    return
+            except Exception:
+                pass
+            time.sleep(0.5)
+        raise RuntimeError(f"L'api n'est pas prête après {timeout}s")
+
+
+def run_load(client, plan, concurrency, total_requests, duration, warmup):
+    """
+    Lance les clients virtuels ; renvoie la liste des (modèle, latence en s, succès)
+    et la durée de la mesure. Les `warmup` premières requêtes ne sont pas comptées.
+    """
+    lock = threading.Lock()
+    counter = itertools.count()
+    results = []
+    state = {"start": None}
+
+    def worker():
+        while True:
+            with lock:
+                index = next(counter)
+                if index == warmup:
+                    state["start"] = time.perf_counter()
+                if total_requests and index >= warmup + total_requests:
+                    return
+                if duration and state["start"] is not None and time.perf_counter() - state["start"] > duration:
+                    return
+                text, model = next(plan)
+            start = time.perf_counter()
+            try:
+                ok = client.predict(text, model)
+            except Exception:
+                ok = False
+            latency = time.perf_counter() - start
+            if index >= warmup:
+                with lock:
+                    results.append((model, latency, ok))
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - (state["start"] or time.perf_counter())
+    return results, elapsed
+
+
+def summarize(latencies, errors, elapsed):
+    latencies_ms = np.array(latencies) * 1000
+    count = len(latencies_ms)
+    p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99]) if count else (0, 0, 0)
+    return {
+        "requests": count,
+        "errors": errors,
+        "error_rate": round(errors / count, 4) if count else 0.0,
+        "throughput_rps": round(count / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "p50": round(float(p50), 2),
+            "p95": round(float(p95), 2),
+            "p99": round(float(p99), 2),
+            "mean": round(float(latencies_ms.mean()), 2) if count else 0.0,
+            "max": round(float(latencies_ms.max()), 2) if count else 0.0,
+        },
+    }
+
+
+def build_report(results, elapsed, settings):
+    models = {}
+    for model in sorted({model for model, _, _ in results}):
+        rows = [(latency, ok) for name, latency, ok in results if name == model]
+        models[model] = summarize([latency for latency, _ in rows], sum(1 for _, ok in rows if not ok), elapsed)
+    return {
+        "settings": settings,
+        "duration_s": round(elapsed, 2),
+        "overall": summarize([latency for _, latency, _ in results],
+                             sum(1 for _, _, ok in results if not ok), elapsed),
+        "models": models,
+    }
+
+
+def compare_reports(baseline, current, max_regression):
+    """
+    Compare deux rapports modèle par modèle. Une régression est une hausse de
+    p95/p99 ou une baisse de débit de plus de max_regression %, ou une hausse
+    du taux d'erreur.
+    """
+    def change(before, after):
+        return round((after - before) / before * 100, 1) if before else 0.0
+
+    comparison, regressions = {}, []
+    for model in sorted(set(baseline["models"]) | set(current["models"])):
+        before, after = baseline["models"].get(model), current["models"].get(model)
+        if before is None or after is None:
+            comparison[model] = {"missing_in": "baseline" if before is None else "current"}
+            continue
+        deltas = {
+            "p50_change_pct": change(before["latency_ms"]["p50"], after["latency_ms"]["p50"]),
+            "p95_change_pct": change(before["latency_ms"]["p95"], after["latency_ms"]["p95"]),
+            "p99_change_pct": change(before["latency_ms"]["p99"], after["latency_ms"]["p99"]),
+            "throughput_change_pct": change(before["throughput_rps"], after["throughput_rps"]),
+            "error_rate_change": round(after["error_rate"] - before["error_rate"], 4),
+        }
+        comparison[model] = deltas
+        if deltas["p95_change_pct"] > max_regression or deltas["p99_change_pct"] > max_regression:
+            regressions.append(f"{model} : latence p95/p99 en hausse")
+        if deltas["throughput_change_pct"] < -max_regression:
+            regressions.append(f"{model} : débit en baisse")
+        if deltas["error_rate_change"] > 0:
+            regressions.append(f"{model} : taux d'erreur en hausse")
+    return {"max_regression_pct": max_regression, "models": comparison, "regressions": regressions}
+
+
+def command_run(args):
+    if not args.requests and not args.duration:
+        args.requests = 1000
+    mix = parse_mix(args.mix)
+    samples = load_texts(args.source, args.text_field, args.limit)
+    if not samples:
+        sys.exit(f"Aucun texte à rejouer dans {args.source}")
+    settings = {
+        "target": args.url or "in-process",
+        "source": args.source,
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "duration_s": args.duration,
+        "warmup": args.warmup,
+        "mix": mix,
+        "no_cache": args.no_cache,
+    }
+    # Les print de l'api lancée dans le processus ne doivent pas se mêler au rapport JSON
+    with contextlib.redirect_stdout(sys.stderr), Client(args.url, args.no_cache) as client:
+        client.wait_ready(args.ready_timeout)
+        results, elapsed = run_load(client, request_plan(samples, mix, args.seed),
+                                    args.concurrency, args.requests, args.duration, args.warmup)
+    report = build_report(results, elapsed, settings)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            report["comparison"] = compare_reports(json.load(f), report, args.max_regression)
+    write_json(report, args.output)
+    return 1 if report.get("comparison", {}).get("regressions") else 0
+
+
+def command_compare(args):
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.current, encoding="utf-8") as f:
+        current = json.load(f)
+    comparison = compare_reports(baseline, current, args.max_regression)
+    write_json(comparison, args.output)
+    return 1 if comparison["regressions"] else 0
+
+
+def write_json(data, path):
+    text = json.dumps(data, indent=2, ensure_ascii=False)
+    if path:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        print(f"Rapport écrit dans {path}", file=sys.stderr)
+    else:
+        print(text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test de charge de l'endpoint /predict")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="lance un test de charge")
+    run.add_argument("--url", help="api déjà lancée (ex: http://127.0.0.1:8000) ; par défaut : api dans le processus")
+    run.add_argument("--source", default="data/all_news_cleaned.csv", help="fichier .csv ou .jsonl des textes")
+    run.add_argument("--text-field", default="text", help="colonne (ou champ .jsonl) contenant le texte")
+    run.add_argument("--limit", type=int, default=0, help="nombre maximal de textes lus (0 = tous)")
+    run.add_argument("--mix", default="randomforest",
+                     help='mélange de modèles, ex: "randomforest=3,bert=1"')
+    run.add_argument("--concurrency", type=int, default=8, help="nombre de requêtes en vol")
+    run.add_argument("--requests", type=int, default=0, help="nombre de requêtes mesurées")
+    run.add_argument("--duration", type=float, default=0, help="durée de la mesure en secondes")
+    run.add_argument("--warmup", type=int, default=20, help="requêtes de chauffe, non comptées")
+    run.add_argument("--no-cache", action="store_true", help="désactive le cache des prédictions (api dans le processus)")
+    run.add_argument("--seed", type=int, default=42)
+    run.add_argument("--ready-timeout", type=float, default=300)
+    run.add_argument("--baseline", help="rapport JSON de référence à comparer à ce test")
+    run.add_argument("--max-regression", type=float, default=10, help="dégradation tolérée, en %%")
+    run.add_argument("--output", help="fichier JSON du rapport")
+    run.set_defaults(handler=command_run)
+
+    compare = commands.add_parser("compare", help="compare deux rapports JSON")
+    compare.add_argument("baseline")
+    compare.add_argument("current")
+    compare.add_argument("--max-regression", type=float, default=10, help="dégradation tolérée, en %%")
+    compare.add_argument("--output", help="fichier JSON de la comparaison")
+    compare.set_defaults(handler=command_compare)
+
+    args = parser.parse_args()
+    sys.exit(args.handler(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,69 +1,722 @@
-from fastapi import FastAPI, Query
+import time
+IMPORT_START = time.perf_counter()
+
+from fastapi import FastAPI, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
+from typing import List, Optional
 import joblib
 import uvicorn
-from preprocess import clean_text
+from preprocess import clean_text, clean_texts
 import numpy as np
 import os
 import sys
-from transformers import pipeline
+import asyncio
+import json
+from bert_batcher import BertMicroBatcher
+from model_registry import ModelRegistry
+from executors import InferenceExecutors
+from prediction_cache import PredictionCache, artifact_version, text_digest
+from single_flight import SingleFlight
+from admission import AdmissionController, Overloaded, RateLimiter
+from metrics import MetricsRegistry
+from tree_engine import compile_model
+from linear_engine import compile_linear
+from startup import Startup, enable_offline_mode
+import config
+
+# transformers et torch ne sont importés qu'au chargement de BERT : un worker
+# qui ne sert que les modèles TF-IDF démarre sans eux
+startup_state = Startup(import_seconds=time.perf_counter() - IMPORT_START)
+
+# Modèles basés sur le TF-IDF, désignés par le nom attendu dans la requête
+TREE_MODELS = ("randomforest", "xgboost", "gradientboosting")
+LINEAR_MODELS = ("logisticregression", "sgd")
+TFIDF_MODELS = TREE_MODELS + LINEAR_MODELS
+# Vectoriseur de chaque modèle : le TF-IDF partagé, sauf pour la régression
+# logistique SMOTE (TF-IDF ajusté sur son échantillon) et le modèle entraîné
+# hors mémoire (vectoriseur à hachage)
+MODEL_VECTORIZERS = {"logisticregression": "logreg_vectorizer", "sgd": "hashing_vectorizer"}
+VECTORIZERS = ("vectorizer", "logreg_vectorizer", "hashing_vectorizer")
+
+def vectorizer_name(model_name):
+    return MODEL_VECTORIZERS.get(model_name, "vectorizer")
+
+# Mode "ensemble" : une vectorisation par vectoriseur distinct des modèles pondérés
+unknown_ensemble_models = sorted(set(config.ENSEMBLE_WEIGHTS) - set(TFIDF_MODELS))
+if unknown_ensemble_models:
+    raise ValueError(f"ENSEMBLE_WEIGHTS : modèles TF-IDF inconnus {unknown_ensemble_models}")
+ENSEMBLE_VECTORIZERS = tuple(dict.fromkeys(vectorizer_name(name) for name in config.ENSEMBLE_WEIGHTS))
+# Modèles acceptés par /predict
+PREDICT_MODELS = ("bert", "ensemble", "cascade") + TFIDF_MODELS
+# Modèles acceptés par les endpoints de prédiction groupée
+BATCH_MODELS = ("bert",) + TFIDF_MODELS
+
+# ========== Métriques ==========
+metrics = MetricsRegistry()
+stage_latency = metrics.histogram(
+    "fakenews_stage_seconds", "Durée de chaque étape de prédiction", ("model", "stage"))
+request_latency = metrics.histogram(
+    "fakenews_request_seconds", "Durée totale des requêtes de prédiction", ("endpoint", "model"))
+requests_total = metrics.counter(
+    "fakenews_requests_total", "Nombre de requêtes de prédiction", ("endpoint", "model"))
+errors_total = metrics.counter(
+    "fakenews_errors_total", "Nombre de requêtes de prédiction en erreur", ("endpoint", "model"))
+bert_batch_size = metrics.histogram(
+    "fakenews_bert_batch_size", "Nombre de textes par passe avant BERT", (), buckets=(1, 2, 4, 8, 16, 32, 64))
+model_load_seconds = metrics.histogram(
+    "fakenews_model_load_seconds", "Durée de chargement des modèles", ("model",),
+    buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120))
+coalesced_total = metrics.counter(
+    "fakenews_coalesced_requests_total", "Requêtes servies par un calcul identique déjà en cours", ("model",))
+coalesced_saved_seconds = metrics.counter(
+    "fakenews_coalesced_saved_seconds_total", "Temps de calcul économisé par le regroupement des requêtes", ("model",))
+model_reloads = metrics.counter(
+    "fakenews_model_reloads_total", "Nombre de remplacements à chaud d'un modèle", ("model",))
+rejected_total = metrics.counter(
+    "fakenews_rejected_total", "Requêtes refusées avec un 429", ("reason", "model"))
+cascade_decisions = metrics.counter(
+    "fakenews_cascade_decisions_total", "Étape qui a décidé en mode cascade", ("stage",))
+
+def record_bert_batch(size, seconds):
+    bert_batch_size.observe(size)
+    stage_latency.observe(seconds, "bert", "bert_forward")
+
+def load_bert():
+    model_path = config.MODEL_PATHS["bert"]
+    if config.OFFLINE:
+        enable_offline_mode()
+        if not os.path.isdir(model_path):
+            raise RuntimeError(f"Mode hors ligne : le modèle BERT '{model_path}' doit être un dossier local")
+    from transformers import pipeline
+
+    # BERT via Hugging Face
+    bert = pipeline("text-classification", model=model_path, tokenizer=config.BERT_TOKENIZER)
+    if config.BERT_QUANTIZATION == "int8":
+        from bert_quantization import quantize_pipeline
+        bert = quantize_pipeline(bert)
+    return bert
+
+def joblib_loader(path):
+    return lambda: joblib.load(path, mmap_mode=config.JOBLIB_MMAP_MODE)
+
+def tree_model_loader(path):
+    if config.TREE_ENGINE == "compiled":
+        return lambda: compile_model(joblib.load(path, mmap_mode=config.JOBLIB_MMAP_MODE), config.TREE_ENGINE_MAX_BATCH)
+    return joblib_loader(path)
+
+def linear_model_loader(path):
+    if config.LINEAR_ENGINE == "sparse":
+        return lambda: compile_linear(joblib.load(path, mmap_mode=config.JOBLIB_MMAP_MODE))
+    return joblib_loader(path)
+
+# Les modèles et le vectoriseur sont chargés au premier usage et déchargés
+# (du moins récemment utilisé au plus récent) si le budget mémoire est dépassé
+registry = ModelRegistry(
+    memory_budget_mb=config.MODEL_MEMORY_BUDGET_MB,
+    on_load=lambda name, seconds: model_load_seconds.observe(seconds, name),
+)
+registry.register("bert", load_bert, path=config.MODEL_PATHS["bert"])
+for name in VECTORIZERS:
+    registry.register(name, joblib_loader(config.MODEL_PATHS[name]), path=config.MODEL_PATHS[name])
+for name in TREE_MODELS:
+    registry.register(name, tree_model_loader(config.MODEL_PATHS[name]), path=config.MODEL_PATHS[name])
+for name in LINEAR_MODELS:
+    registry.register(name, linear_model_loader(config.MODEL_PATHS[name]), path=config.MODEL_PATHS[name])
+
+# Cache des réponses de /predict, adressé par le texte nettoyé et la version du modèle
+prediction_cache = None
+if config.PREDICTION_CACHE_SIZE > 0:
+    prediction_cache = PredictionCache(
+        max_entries=config.PREDICTION_CACHE_SIZE,
+        ttl_seconds=config.PREDICTION_CACHE_TTL,
+        sqlite_path=config.PREDICTION_CACHE_DB or None,
+    )
+
+# Files bornées par modèle et limite de débit par client sur /predict
+admission = AdmissionController(config.MAX_QUEUE, concurrency=config.MODEL_CONCURRENCY)
+rate_limiter = None
+if config.RATE_LIMIT_PER_SECOND > 0:
+    rate_limiter = RateLimiter(config.RATE_LIMIT_PER_SECOND, config.RATE_LIMIT_BURST)
+
+# Regroupement des requêtes identiques en cours, clé (modèle, version, texte nettoyé)
+single_flight = None
+if config.COALESCE_REQUESTS:
+    single_flight = SingleFlight(on_coalesced=lambda model, seconds: (
+        coalesced_total.inc(model), coalesced_saved_seconds.inc(model, amount=seconds)))
+
+def model_version(model_name, long_document=False):
+    """
+    Version des artefacts servis par un modèle (le vectoriseur compte pour les
+    modèles TF-IDF) : c'est la version chargée, pas celle du fichier sur le
+    disque, pour qu'un artefact réentraîné mais pas encore rechargé ne mette
+    pas en cache des réponses de l'ancien modèle sous la nouvelle version.
+    """
+    if model_name == "ensemble":
+        weights = ",".join(f"{name}={weight}" for name, weight in sorted(config.ENSEMBLE_WEIGHTS.items()))
+        parts = [registry.version(name) for name in sorted(config.ENSEMBLE_WEIGHTS)] + [weights]
+        parts += [registry.version(name) for name in ENSEMBLE_VECTORIZERS]
+    elif model_name in ("bert", "cascade"):
+        # La quantification change les probabilités : elle fait partie de la version
+        parts = [registry.version("bert"), f"quantization={config.BERT_QUANTIZATION}"]
+        if model_name == "cascade":
+            parts += [registry.version(config.CASCADE_FIRST_MODEL),
+                      f"band={config.CASCADE_BAND_LOW},{config.CASCADE_BAND_HIGH}"]
+        if long_document:
+            parts.append(
+                f"long={config.BERT_WINDOW_TOKENS},{config.BERT_WINDOW_STRIDE},"
+                f"{config.BERT_MAX_WINDOWS},{config.BERT_WINDOW_AGGREGATION}"
+            )
+    else:
+        parts = [registry.version(model_name)]
+    if model_name not in ("bert", "ensemble"):
+        tfidf_model = config.CASCADE_FIRST_MODEL if model_name == "cascade" else model_name
+        parts.append(registry.version(vectorizer_name(tfidf_model)))
+    return artifact_version(parts)
 
-# Charger les modèles et vectoriseur
-# BERT via Hugging Face
-bert_model = pipeline("text-classification", model="bert-base-uncased")
-rf_model = joblib.load("model/fake_news_random_forest_classifier.pkl")
-xgb_model = joblib.load("model/xgboost_fake_news.pkl")
-vectorizer = joblib.load("model/tfidf_vectorizer.pkl")
-gradient_boosting_model = joblib.load("model/gradient_boosting_fake_news.pkl")
+# Pools dédiés et limites de concurrence par modèle
+executors = InferenceExecutors(
+    tree_threads=config.TREE_EXECUTOR_THREADS,
+    bert_threads=config.BERT_EXECUTOR_THREADS,
+    concurrency_limits=config.MODEL_CONCURRENCY,
+)
+
+# Regroupe les requêtes BERT concurrentes en une seule passe avant
+bert_batcher = BertMicroBatcher(
+    lambda: registry.get("bert"),
+    max_batch_size=config.BERT_MAX_BATCH_SIZE,
+    max_wait_ms=config.BERT_MAX_WAIT_MS,
+    executor=executors.bert_pool,
+    on_batch=record_bert_batch,
+)
+
+def score_long(bert_pipeline, texts):
+    from bert_long import score_long_documents
+    return score_long_documents(
+        bert_pipeline, texts,
+        window_tokens=config.BERT_WINDOW_TOKENS,
+        stride=config.BERT_WINDOW_STRIDE,
+        max_windows=config.BERT_MAX_WINDOWS,
+        aggregation=config.BERT_WINDOW_AGGREGATION,
+        max_windows_per_batch=config.BERT_MAX_WINDOWS_PER_BATCH,
+    )
+
+# Articles longs : les fenêtres des requêtes concurrentes sont évaluées ensemble
+bert_long_batcher = BertMicroBatcher(
+    lambda: registry.get("bert"),
+    max_batch_size=config.BERT_MAX_BATCH_SIZE,
+    max_wait_ms=config.BERT_MAX_WAIT_MS,
+    executor=executors.bert_pool,
+    on_batch=record_bert_batch,
+    forward=score_long,
+)
+
+metrics.gauge(
+    "fakenews_queue_depth", "Requêtes en attente dans la file du micro-batcher BERT", ("queue",),
+    lambda: {("bert_batcher",): bert_batcher.depth(), ("bert_long_batcher",): bert_long_batcher.depth()})
+metrics.gauge(
+    "fakenews_in_flight", "Requêtes en cours par modèle", ("model",),
+    lambda: {(name,): count for name, count in executors.in_flight().items()})
+metrics.gauge(
+    "fakenews_admission_queue", "Requêtes admises (en attente ou en cours) par modèle", ("model",),
+    lambda: {(name,): count for name, count in admission.occupancy().items()})
+metrics.gauge(
+    "fakenews_admission_queue_limit", "Taille maximale de la file d'admission par modèle (0 = sans limite)", ("model",),
+    lambda: {(name,): limit for name, limit in config.MAX_QUEUE.items()})
+metrics.gauge(
+    "fakenews_models_loaded", "Modèles actuellement chargés (1) ou non (0)", ("model",),
+    lambda: {(name,): int(name in registry.entries) for name in registry.loaders})
+if prediction_cache is not None:
+    metrics.gauge(
+        "fakenews_cache_lookups", "Consultations du cache des prédictions par résultat", ("result",),
+        lambda: {(result,): prediction_cache.stats()[result] for result in ("memory_hits", "disk_hits", "misses")})
+    metrics.gauge(
+        "fakenews_cache_errors", "Erreurs SQLite du niveau disque du cache des prédictions", (),
+        lambda: {(): prediction_cache.stats()["errors"]})
 
 app = FastAPI()
 
+WARM_UP_TEXT = "Warm-up request for the fake news detection service."
+
+def warm_up_model(name, model, resolve):
+    """
+    Première inférence d'un modèle, pour que la première vraie requête ne paie
+    pas les initialisations paresseuses. resolve(nom) donne les autres modèles
+    nécessaires (le vectoriseur pour les modèles TF-IDF).
+    """
+    if name in VECTORIZERS:
+        model.transform([WARM_UP_TEXT])
+    elif name == "bert":
+        model([WARM_UP_TEXT], truncation=True)
+    elif name in TFIDF_MODELS:
+        model.predict_proba(resolve(vectorizer_name(name)).transform([WARM_UP_TEXT]))
+
+def warm_up(name):
+    warm_up_model(name, registry.get(name), registry.get)
+
+def reload_models(names):
+    """Recharge les modèles en arrière-plan, les teste, puis remplace les versions actives d'un coup."""
+    versions = registry.reload(names, warm_up=warm_up_model)
+    for name in names:
+        model_reloads.inc(name)
+    return versions
+
+async def watch_artifacts():
+    """
+    Surveille les artefacts des modèles chargés (toutes les MODEL_WATCH_INTERVAL
+    secondes) et recharge ceux qui ont été réentraînés. Un fichier n'est
+    rechargé que si sa version n'a pas changé entre deux passages : un script
+    d'entraînement encore en train d'écrire le pickle (ou d'écrire le modèle
+    puis le vectoriseur) n'est pas rechargé à moitié.
+    """
+    pending = {}
+    while True:
+        await asyncio.sleep(config.MODEL_WATCH_INTERVAL)
+        changed = await run_in_threadpool(registry.changed)
+        versions = {name: registry.disk_version(name) for name in changed}
+        stable = [name for name in changed if pending.get(name) == versions[name]]
+        pending = versions
+        if stable and len(stable) == len(changed):
+            try:
+                await run_in_threadpool(reload_models, stable)
+            except Exception as e:
+                print(f"Rechargement de {stable} impossible, les versions actives sont conservées : {e}")
+            pending = {}
+
+@app.on_event("startup")
+async def startup():
+    bert_batcher.start()
+    bert_long_batcher.start()
+    # Chargement et warm-up en arrière-plan : /health/live répond tout de suite,
+    # /health/ready seulement une fois les modèles préchargés prêts
+    app.state.startup_task = asyncio.get_running_loop().create_task(run_in_threadpool(
+        startup_state.run, registry, config.PRELOAD_MODELS, warm_up, config.PRELOAD_PARALLEL))
+    if config.MODEL_WATCH_INTERVAL > 0:
+        app.state.watch_task = asyncio.get_running_loop().create_task(watch_artifacts())
+
+@app.on_event("shutdown")
+async def shutdown():
+    startup_state.stop()
+    if getattr(app.state, "watch_task", None) is not None:
+        app.state.watch_task.cancel()
+    await bert_batcher.stop()
+    await bert_long_batcher.stop()
+    if prediction_cache is not None:
+        await run_in_threadpool(prediction_cache.close)
+    executors.shutdown()
+
 class NewsInput(BaseModel):
     text: str
-    model: str  # "bert", "randomforest", "xgboost", "gradientboosting"
+    model: str  # "bert", "randomforest", "xgboost", "gradientboosting", "logisticregression", "sgd", "ensemble", "cascade"
+    # BERT uniquement : évaluer tout l'article par fenêtres glissantes (par défaut : BERT_LONG_DOCUMENTS)
+    long_document: Optional[bool] = None
+
+class BatchNewsInput(BaseModel):
+    texts: List[str]
+    model: str  # mêmes valeurs que NewsInput.model
+    long_document: Optional[bool] = None
+
+def format_bert_prediction(prediction):
+    """Convertit une sortie du pipeline BERT au format de réponse de l'API."""
+    # Le score du pipeline est celui du label prédit
+    fake = prediction['label'] == "LABEL_1"
+    proba = prediction['score'] if fake else 1 - prediction['score']
+    response = {
+        "prediction": "FAKE" if fake else "REAL",
+        "probabilities": {"FAKE": round(proba, 3), "REAL": round(1 - proba, 3)}
+    }
+    if "windows" in prediction:
+        response["windows"] = prediction["windows"]
+    return response
+
+def format_proba(proba):
+    """Convertit une ligne de predict_proba (classes [REAL, FAKE]) au format de réponse."""
+    return {
+        "prediction": "FAKE" if proba[1] > proba[0] else "REAL",
+        "probabilities": {"FAKE": round(float(proba[1]), 3), "REAL": round(float(proba[0]), 3)}
+    }
 
 @app.get("/")
 def home():
     return {"message": "Fake News Detection API is running 🎯"}
 
+@app.get("/health/live")
+def liveness():
+    return {"alive": True}
+
+@app.get("/health/ready")
+def readiness():
+    """Sonde de disponibilité : 503 tant que les modèles préchargés ne sont pas chargés et testés."""
+    return JSONResponse(startup_state.status(), status_code=200 if startup_state.ready else 503)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics_endpoint():
+    """Métriques au format texte Prometheus."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/admin/models")
+def models_status():
+    """État du registre : modèles chargés, mémoire estimée, dernier usage."""
+    return {**registry.status(), "in_flight": executors.in_flight()}
+
+@app.post("/admin/models/reload")
+async def reload_models_endpoint(models: Optional[List[str]] = Query(None), force: bool = False):
+    """
+    Recharge sans interruption les modèles donnés (par défaut : les modèles
+    chargés dont l'artefact a changé sur le disque). La nouvelle version est
+    chargée et testée en arrière-plan, les requêtes continuent d'être servies
+    par l'ancienne jusqu'au remplacement.
+    """
+    if models is None:
+        models = sorted(registry.entries) if force else await run_in_threadpool(registry.changed)
+    unknown = [name for name in models if name not in registry]
+    if unknown:
+        return JSONResponse({"error": f"Modèles inconnus : {unknown}"}, status_code=404)
+    if not models:
+        return {"reloaded": {}}
+    try:
+        versions = await run_in_threadpool(reload_models, models)
+    except Exception as e:
+        return JSONResponse({"error": f"Rechargement impossible, versions actives conservées : {e}"}, status_code=500)
+    return {"reloaded": versions}
+
+@app.get("/admin/coalescing")
+def coalescing_status():
+    """Requêtes identiques regroupées sur un même calcul, par modèle, et temps de calcul économisé."""
+    if single_flight is None:
+        return {"enabled": False}
+    return {"enabled": True, **single_flight.stats()}
+
+@app.get("/admin/admission")
+def admission_status():
+    """Occupation des files d'admission, refus par modèle et nombre de clients suivis par la limite de débit."""
+    return {
+        "queues": {
+            name: {"pending": pending, "limit": config.MAX_QUEUE[name], "rejected": admission.rejected.get(name, 0)}
+            for name, pending in admission.occupancy().items()
+        },
+        "rate_limit": None if rate_limiter is None else {
+            "per_second": rate_limiter.rate, "burst": rate_limiter.burst, "clients": rate_limiter.clients()},
+    }
+
+@app.get("/admin/cache")
+def cache_status():
+    """Compteurs du cache des prédictions (hits, misses, invalidations)."""
+    if prediction_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **prediction_cache.stats()}
+
+def vectorize(vectorizer, cleaned, model_name):
+    with stage_latency.time(model_name, "vectorize"):
+        return vectorizer.transform([cleaned])
+
+def predict_vectorized(model, model_name, vectorized):
+    with stage_latency.time(model_name, "predict_proba"):
+        return model.predict_proba(vectorized)[0]
+
+def predict_tree(model_name, cleaned):
+    vectorizer, model = registry.get_many((vectorizer_name(model_name), model_name))
+    return predict_vectorized(model, model_name, vectorize(vectorizer, cleaned, model_name))
+
+async def predict_ensemble(cleaned):
+    """
+    Mode "ensemble" : une seule vectorisation par vectoriseur (le TF-IDF
+    partagé par les arbres, ceux des modèles linéaires), puis les modèles
+    TF-IDF évalués en parallèle sur leur ligne CSR et combinés par moyenne pondérée.
+    """
+    loop = asyncio.get_running_loop()
+    weights = config.ENSEMBLE_WEIGHTS
+    loaded = await loop.run_in_executor(
+        executors.tree_pool, registry.get_many, (*ENSEMBLE_VECTORIZERS, *weights))
+    vectorizers, models = loaded[:len(ENSEMBLE_VECTORIZERS)], loaded[len(ENSEMBLE_VECTORIZERS):]
+    vectorized = {}
+    for name, vectorizer in zip(ENSEMBLE_VECTORIZERS, vectorizers):
+        vectorized[name] = await loop.run_in_executor(executors.tree_pool, vectorize, vectorizer, cleaned, "ensemble")
+    probas = await asyncio.gather(*(
+        executors.run(name, predict_vectorized, model, name, vectorized[vectorizer_name(name)])
+        for name, model in zip(weights, models)
+    ))
+    total = sum(weights.values())
+    average = sum(weight * proba for weight, proba in zip(weights.values(), probas)) / total
+    response = format_proba(average)
+    response["models"] = {name: format_proba(proba) for name, proba in zip(weights, probas)}
+    response["weights"] = weights
+    return response
+
+async def predict_bert(cleaned, long_document=False):
+    batcher = bert_long_batcher if long_document else bert_batcher
+    async with executors.limit("bert"):
+        return format_bert_prediction(await batcher.predict(cleaned))
+
+async def predict_cascade(cleaned, long_document=False):
+    """
+    Mode "cascade" : le modèle TF-IDF le plus rapide répond seul quand il est
+    sûr de lui ; si sa probabilité FAKE tombe dans la bande d'incertitude
+    [CASCADE_BAND_LOW, CASCADE_BAND_HIGH], BERT décide. "stage" indique le
+    modèle qui a décidé.
+    """
+    first = config.CASCADE_FIRST_MODEL
+    proba = await executors.run(first, predict_tree, first, cleaned)
+    first_response = format_proba(proba)
+    if not config.CASCADE_BAND_LOW <= proba[1] <= config.CASCADE_BAND_HIGH:
+        cascade_decisions.inc(first)
+        return {**first_response, "stage": first}
+    try:
+        admission.acquire("bert")
+    except Overloaded:
+        # File BERT pleine : la réponse du premier modèle est renvoyée plutôt qu'un 429
+        cascade_decisions.inc("degraded")
+        return {**first_response, "stage": first, "degraded": True}
+    cascade_decisions.inc("bert")
+    start = time.perf_counter()
+    try:
+        response = await predict_bert(cleaned, long_document)
+    finally:
+        admission.release("bert", time.perf_counter() - start)
+    return {**response, "stage": "bert", "models": {first: first_response}}
+
+def metric_label(model_name, known_models):
+    # Les noms de modèles inconnus sont regroupés pour ne pas multiplier les séries
+    return model_name if model_name in known_models else "unknown"
+
+def client_key(request):
+    return request.headers.get(config.RATE_LIMIT_KEY_HEADER) or (request.client.host if request.client else "unknown")
+
+def too_many_requests(error, label):
+    rejected_total.inc(error.reason, label)
+    return JSONResponse(
+        {"error": "Too many requests", "reason": error.reason, "retry_after": error.retry_after},
+        status_code=429,
+        headers={"Retry-After": str(error.retry_after)},
+    )
+
 @app.post("/predict")
-def predict_news(input_data: NewsInput):
-    cleaned = clean_text(input_data.text)
-
-    if input_data.model.lower() == "bert":
-        prediction = bert_model(cleaned)[0]
-        proba = prediction['score']
-        return {
-            "prediction": "FAKE" if prediction['label'] == "LABEL_1" else "REAL",
-            "probabilities": {"FAKE": round(proba, 3), "REAL": round(1 - proba, 3)}
-        }
-
-    elif input_data.model.lower() == "randomforest":
-        vectorized = vectorizer.transform([cleaned])
-        prediction = rf_model.predict(vectorized)[0]
-        proba = rf_model.predict_proba(vectorized)[0].tolist()
-        return {
-            "prediction": "FAKE" if prediction == 1 else "REAL",
-            "probabilities": {"FAKE": round(proba[1], 3), "REAL": round(proba[0], 3)}
-        }
-
-    elif input_data.model.lower() == "xgboost":
-        vectorized = vectorizer.transform([cleaned])
-        prediction = xgb_model.predict(vectorized)[0]
-        proba = xgb_model.predict_proba(vectorized)[0].tolist()
-        return {
-            "prediction": "FAKE" if prediction == 1 else "REAL",
-            "probabilities": {"FAKE": round(proba[1], 3), "REAL": round(proba[0], 3)}
-        }
-
-    elif input_data.model.lower() == "gradientboosting":
-        vectorized = vectorizer.transform([cleaned])
-        prediction = gradient_boosting_model.predict(vectorized)[0]
-        proba = gradient_boosting_model.predict_proba(vectorized)[0].tolist()
-        return {
-            "prediction": "FAKE" if prediction == 1 else "REAL",
-            "probabilities": {"FAKE": round(proba[1], 3), "REAL": round(proba[0], 3)}
-        }
+async def predict_news(input_data: NewsInput, request: Request):
+    model_name = input_data.model.lower()
+    label = metric_label(model_name, PREDICT_MODELS)
+    requests_total.inc("predict", label)
+    if rate_limiter is not None:
+        try:
+            rate_limiter.acquire(client_key(request))
+        except Overloaded as e:
+            return too_many_requests(e, label)
+    with request_latency.time("predict", label):
+        try:
+            response = await predict_one(model_name, input_data.text, input_data.long_document)
+        except Overloaded as e:
+            return too_many_requests(e, label)
+        except Exception:
+            errors_total.inc("predict", label)
+            raise
+    if "error" in response:
+        errors_total.inc("predict", label)
+    return response
+
+def cache_model_key(model_name, long_document):
+    """
+    Nom du modèle dans le cache des prédictions. Les résultats en fenêtres
+    glissantes ont leur propre entrée : leur version (paramètres des fenêtres)
+    diffère de celle du mode court, et le cache ne garde qu'une version par
+    modèle, purgeant les autres à chaque changement.
+    """
+    return f"{model_name}:long" if long_document else model_name
+
+async def predict_one(model_name, text, long_document=None):
+    if model_name not in PREDICT_MODELS:
+        return {"error": "Unknown model selected"}
+    if long_document is None:
+        long_document = config.BERT_LONG_DOCUMENTS
+    long_document = long_document and model_name in ("bert", "cascade")
+    with stage_latency.time(model_name, "clean_text"):
+        cleaned = clean_text(text)
 
+    version = model_version(model_name, long_document)
+    if prediction_cache is not None:
+        with stage_latency.time(model_name, "cache_lookup"):
+            cached = prediction_cache.get(cache_model_key(model_name, long_document), version, cleaned)
+        if cached is not None:
+            return cached
+
+    if single_flight is None:
+        return await admitted_prediction(model_name, cleaned, long_document, version)
+    # Les requêtes identiques arrivées pendant le calcul attendent son résultat
+    # (et n'occupent pas de place dans la file d'admission)
+    key = (model_name, version, long_document, text_digest(cleaned))
+    return await single_flight.do(key, admitted_prediction, model_name, cleaned, long_document, version)
+
+async def admitted_prediction(model_name, cleaned, long_document, version):
+    """Calcul soumis à la file bornée du modèle : lève Overloaded si elle est pleine."""
+    admission.acquire(model_name)
+    start = time.perf_counter()
+    try:
+        return await compute_prediction(model_name, cleaned, long_document, version)
+    finally:
+        admission.release(model_name, time.perf_counter() - start)
+
+async def compute_prediction(model_name, cleaned, long_document, version):
+    if model_name == "bert":
+        response = await predict_bert(cleaned, long_document)
+    elif model_name == "cascade":
+        response = await predict_cascade(cleaned, long_document)
+    elif model_name == "ensemble":
+        response = await predict_ensemble(cleaned)
     else:
+        proba = await executors.run(model_name, predict_tree, model_name, cleaned)
+        response = format_proba(proba)
+
+    if prediction_cache is not None:
+        prediction_cache.set(cache_model_key(model_name, long_document), version, cleaned, response)
+    return response
+
+def score_batch(model_name, texts, long_document=False):
+    """Nettoie et évalue une liste de textes ; renvoie les résultats et la durée de chaque étape."""
+    timings = {}
+    start = time.perf_counter()
+    cleaned = clean_texts(texts)
+    timings["clean_text"] = time.perf_counter() - start
+
+    if not cleaned:
+        results = []
+    elif model_name == "bert":
+        bert_model = registry.get("bert")
+        start = time.perf_counter()
+        if long_document:
+            predictions = score_long(bert_model, cleaned)
+        else:
+            predictions = bert_model(cleaned, truncation=True)
+        timings["bert_forward"] = time.perf_counter() - start
+        results = [format_bert_prediction(p) for p in predictions]
+    else:
+        vectorizer, model = registry.get_many((vectorizer_name(model_name), model_name))
+        start = time.perf_counter()
+        vectorized = vectorizer.transform(cleaned)
+        timings["vectorize"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        probas = model.predict_proba(vectorized)
+        timings["predict_proba"] = time.perf_counter() - start
+        results = [format_proba(proba) for proba in probas]
+    for stage, seconds in timings.items():
+        stage_latency.observe(seconds, model_name, stage)
+    return results, timings
+
+@app.post("/predict/batch")
+async def predict_news_batch(input_data: BatchNewsInput):
+    """
+    Prédiction groupée : nettoyage de tous les textes, un seul appel à
+    vectorizer.transform sur la liste et un seul predict_proba sur la matrice CSR.
+    Les résultats sont renvoyés dans l'ordre des textes reçus.
+    """
+    model_name = input_data.model.lower()
+    label = metric_label(model_name, BATCH_MODELS)
+    requests_total.inc("predict_batch", label)
+    if model_name not in BATCH_MODELS:
+        errors_total.inc("predict_batch", label)
         return {"error": "Unknown model selected"}
+
+    with request_latency.time("predict_batch", label):
+        try:
+            long_document = config.BERT_LONG_DOCUMENTS if input_data.long_document is None else input_data.long_document
+            results, timings = await executors.run(model_name, score_batch, model_name, input_data.texts, long_document)
+        except Exception:
+            errors_total.inc("predict_batch", label)
+            raise
+    return {
+        "model": model_name,
+        "count": len(results),
+        "results": results,
+        "timings_ms": {stage: round(seconds * 1000, 3) for stage, seconds in timings.items()},
+    }
+
+class NDJSONStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse sans tâche d'écoute de déconnexion : avec un serveur
+    ASGI < 2.4, cette tâche appelle receive() en parallèle et consommerait les
+    morceaux du corps de la requête que le générateur est encore en train de lire.
+    """
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+async def iter_ndjson_lines(request):
+    """Découpe le corps de la requête en lignes au fil de la réception, sans le charger en entier."""
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line
+    if buffer.strip():
+        yield buffer
+
+async def score_ndjson_chunk(chunk):
+    """
+    Évalue un bloc de lignes NDJSON : les textes sont regroupés par modèle
+    (une vectorisation et un predict_proba par modèle ; pour BERT, un groupe
+    par valeur de long_document), puis les résultats sont remis dans l'ordre
+    des lignes reçues.
+    """
+    outputs = [None] * len(chunk)
+    groups = {}
+    for position, (line_number, line) in enumerate(chunk):
+        try:
+            record = json.loads(line)
+            text = str(record["text"])
+            model_name = str(record.get("model") or config.NDJSON_DEFAULT_MODEL).lower()
+            long_document = record.get("long_document")
+            if long_document is None:
+                long_document = config.BERT_LONG_DOCUMENTS
+            elif not isinstance(long_document, bool):
+                raise TypeError("long_document doit être un booléen")
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            outputs[position] = {"line": line_number, "error": f"Ligne NDJSON invalide : {e}"}
+            continue
+        if model_name not in BATCH_MODELS:
+            outputs[position] = {"line": line_number, "error": "Unknown model selected"}
+            continue
+        group = (model_name, long_document and model_name == "bert")
+        groups.setdefault(group, []).append((position, line_number, text))
+
+    scored = await asyncio.gather(*(
+        executors.run(model_name, score_batch, model_name, [text for _, _, text in entries], long_document)
+        for (model_name, long_document), entries in groups.items()
+    ))
+    for (model_name, _), entries in groups.items():
+        requests_total.inc("predict_stream", model_name, amount=len(entries))
+    errors = sum(1 for output in outputs if output is not None)
+    if errors:
+        errors_total.inc("predict_stream", "unknown", amount=errors)
+    for ((model_name, _), entries), (results, _) in zip(groups.items(), scored):
+        for (position, line_number, _), result in zip(entries, results):
+            outputs[position] = {"line": line_number, "model": model_name, **result}
+    return outputs
+
+@app.post("/predict/stream")
+async def predict_news_stream(request: Request):
+    """
+    Prédiction en flux NDJSON : chaque ligne du corps est un objet
+    {"text": ..., "model": ..., "long_document": ...} ; long_document est
+    optionnel (par défaut BERT_LONG_DOCUMENTS, comme pour /predict). Les
+    lignes sont traitées par blocs de NDJSON_CHUNK_SIZE et les résultats
+    renvoyés en NDJSON dès qu'un bloc est terminé, la mémoire reste donc
+    bornée quelle que soit la taille du flux.
+    """
+    async def results():
+        chunk = []
+        line_number = 0
+        async for line in iter_ndjson_lines(request):
+            chunk.append((line_number, line))
+            line_number += 1
+            if len(chunk) >= config.NDJSON_CHUNK_SIZE:
+                for output in await score_ndjson_chunk(chunk):
+                    yield json.dumps(output) + "\n"
+                chunk = []
+        if chunk:
+            for output in await score_ndjson_chunk(chunk):
+                yield json.dumps(output) + "\n"
+
+    return NDJSONStreamingResponse(results(), media_type="application/x-ndjson")
@@ -0,0 +1,252 @@
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+from prediction_cache import artifact_version
+
+# Unité des budgets et des mémoires affichés (Mo = Mio, comme MODEL_MEMORY_BUDGET_MB)
+MB = 1024 * 1024
+
+
+def estimate_memory(model, path=None):
+    """
+    Estimation approximative (en octets) de la mémoire occupée par un modèle :
+    taille des tableaux (et du pickle) pour les modèles compilés, taille des poids pour
+    les modèles PyTorch (pipeline Hugging Face), taille du fichier sérialisé
+    pour les pickles joblib.
+    """
+    file_size = os.path.getsize(path) if path is not None and os.path.exists(path) else 0
+    if hasattr(model, "nbytes"):
+        # Modèle compilé : tableaux aplatis en plus du modèle d'origine qu'il conserve
+        return model.nbytes + file_size
+    torch_model = getattr(model, "model", model)
+    if hasattr(torch_model, "state_dict"):
+        # state_dict plutôt que parameters() : les poids INT8 empaquetés n'apparaissent que là
+        total = 0
+        for value in torch_model.state_dict().values():
+            tensors = value if isinstance(value, tuple) else (value,)
+            total += sum(t.numel() * t.element_size() for t in tensors if hasattr(t, "element_size"))
+        return total
+    return file_size
+
+
+class ModelRegistry:
+    """
+    Registre de modèles chargés à la demande.
+
+    Chaque modèle est déclaré avec une fonction de chargement et n'est chargé
+    qu'au premier appel de get() (ou via preload()). La mémoire de chaque
+    modèle est estimée au chargement et, si le budget mémoire est dépassé,
+    les modèles utilisés le moins récemment sont déchargés.
+
+    Chaque modèle chargé garde la version de son artefact (date et taille du
+    fichier). reload() charge une nouvelle version en arrière-plan, la teste,
+    puis remplace l'ancienne d'un coup : les requêtes en cours gardent leur
+    référence sur l'ancienne version, libérée quand elles sont terminées.
+    """
+
+    def __init__(self, memory_budget_mb=0, on_load=None):
+        # 0 = pas de limite
+        self.memory_budget = int(memory_budget_mb * MB)
+        self.loaders = {}
+        self.paths = {}
+        # Modèles chargés, du moins récemment utilisé au plus récent
+        self.entries = OrderedDict()
+        self.lock = threading.RLock()
+        self.load_locks = {}
+        self.evictions = 0
+        self.reloads = 0
+        # Anciennes versions remplacées par reload(), encore référencées par des requêtes en cours
+        self.retired = []
+        # Appelée avec (nom, durée de chargement) après chaque chargement
+        self.on_load = on_load
+
+    def register(self, name, loader, path=None):
+        with self.lock:
+            self.loaders[name] = loader
+            self.paths[name] = path
+            self.load_locks[name] = threading.Lock()
+
+    def __contains__(self, name):
+        return name in self.loaders
+
+    def disk_version(self, name):
+        """Version de l'artefact actuellement sur le disque."""
+        path = self.paths[name]
+        return artifact_version([path]) if path is not None else None
+
+    def version(self, name):
+        """Version servie : celle du modèle chargé, sinon celle qui serait chargée depuis le disque."""
+        with self.lock:
+            entry = self.entries.get(name)
+            if entry is not None:
+                return entry["version"]
+        return self.disk_version(name)
+
+    def _load(self, name):
+        version = self.disk_version(name)
+        start = time.perf_counter()
+        model = self.loaders[name]()
+        load_time = time.perf_counter() - start
+        entry = {
+            "model": model,
+            "version": version,
+            "memory": estimate_memory(model, self.paths[name]),
+            "load_time": load_time,
+            "loaded_at": time.time(),
+            "last_used": time.time(),
+            "hits": 1,
+        }
+        if self.on_load is not None:
+            self.on_load(name, load_time)
+        print(f"Modèle '{name}' (version {version}) chargé en {load_time:.2f}s ({entry['memory'] / MB:.1f} Mo)")
+        return entry
+
+    def get(self, name):
+        return self._get(name, keep=(name,))
+
+    def _get(self, name, keep):
+        # keep : modèles protégés du déchargement si ce chargement dépasse le budget
+        with self.lock:
+            entry = self.entries.get(name)
+            if entry is not None:
+                self.entries.move_to_end(name)
+                entry["last_used"] = time.time()
+                entry["hits"] += 1
+                return entry["model"]
+        if name not in self.loaders:
+            raise KeyError(f"Modèle inconnu : {name}")
+
+        # Un verrou par modèle : deux requêtes simultanées ne chargent pas deux fois le même modèle
+        with self.load_locks[name]:
+            with self.lock:
+                if name in self.entries:
+                    return self._get(name, keep)
+            entry = self._load(name)
+            with self.lock:
+                self.entries[name] = entry
+                self._evict_over_budget(keep=keep)
+            return entry["model"]
+
+    def get_many(self, names):
+        """
+        Renvoie plusieurs modèles pris au même instant : un reload() ne peut pas
+        intervenir entre les deux, le vectoriseur et le modèle servis ensemble
+        sont donc toujours de la même génération.
+        """
+        names = tuple(names)
+        # Chargement des modèles absents, sans que l'un décharge l'autre
+        models = [self._get(name, keep=names) for name in names]
+        with self.lock:
+            if all(name in self.entries for name in names):
+                return [self.entries[name]["model"] for name in names]
+        # Un autre chargement simultané a déchargé l'un d'eux (budget mémoire) :
+        # les références obtenues ci-dessus restent utilisables, sans nouvel essai
+        return models
+
+    def preload(self, names):
+        for name in names:
+            self.get(name)
+
+    def changed(self):
+        """Modèles chargés dont l'artefact sur le disque a changé depuis le chargement."""
+        with self.lock:
+            loaded = {name: entry["version"] for name, entry in self.entries.items()}
+        return [name for name, version in loaded.items() if self.disk_version(name) != version]
+
+    def reload(self, names, warm_up=None):
+        """
+        Charge une nouvelle version des modèles donnés, la teste avec
+        warm_up(nom, modèle, resolve) puis remplace toutes les versions
+        actives en une seule opération. resolve(nom) donne le modèle de la
+        nouvelle génération s'il fait partie du rechargement (ex: le
+        vectoriseur réentraîné avec un modèle), sinon le modèle actif.
+        En cas d'erreur, rien n'est remplacé et l'exception est propagée.
+        """
+        names = [name for name in names if name in self.loaders]
+        locks = [self.load_locks[name] for name in sorted(names)]
+        for lock in locks:
+            lock.acquire()
+        try:
+            fresh = {name: self._load(name) for name in names}
+
+            def resolve(name):
+                return fresh[name]["model"] if name in fresh else self.get(name)
+
+            if warm_up is not None:
+                for name, entry in fresh.items():
+                    warm_up(name, entry["model"], resolve)
+            with self.lock:
+                for name, entry in fresh.items():
+                    old = self.entries.pop(name, None)
+                    self.entries[name] = entry
+                    if old is not None:
+                        self._retire(name, old)
+                self.reloads += 1
+                self._evict_over_budget(keep=fresh)
+        finally:
+            for lock in locks:
+                lock.release()
+        return {name: entry["version"] for name, entry in fresh.items()}
+
+    def _retire(self, name, entry):
+        retired = {"name": name, "version": entry["version"], "retired_at": time.time()}
+        try:
+            retired["ref"] = weakref.ref(entry["model"])
+        except TypeError:
+            # Objet sans support des références faibles : considéré comme libéré
+            return
+        self.retired.append(retired)
+        print(f"Modèle '{name}' : version {entry['version']} remplacée, libérée à la fin des requêtes en cours")
+
+    def _retired_alive(self):
+        self.retired = [retired for retired in self.retired if retired["ref"]() is not None]
+        return self.retired
+
+    def evict(self, name):
+        with self.lock:
+            if self.entries.pop(name, None) is not None:
+                self.evictions += 1
+                print(f"Modèle '{name}' déchargé")
+
+    def memory_used(self):
+        with self.lock:
+            return sum(entry["memory"] for entry in self.entries.values())
+
+    def _evict_over_budget(self, keep):
+        if not self.memory_budget:
+            return
+        # Les modèles qui viennent d'être chargés ne sont jamais déchargés, même s'ils dépassent seuls le budget
+        while self.memory_used() > self.memory_budget:
+            candidates = [name for name in self.entries if name not in keep]
+            if not candidates:
+                break
+            self.evict(candidates[0])
+
+    def status(self):
+        with self.lock:
+            return {
+                "memory_budget_mb": round(self.memory_budget / MB, 2) if self.memory_budget else None,
+                "memory_used_mb": round(self.memory_used() / MB, 1),
+                "evictions": self.evictions,
+                "reloads": self.reloads,
+                "registered": sorted(self.loaders),
+                "loaded": [
+                    {
+                        "name": name,
+                        "version": entry["version"],
+                        "memory_mb": round(entry["memory"] / MB, 1),
+                        "load_time_s": round(entry["load_time"], 3),
+                        "loaded_at": entry["loaded_at"],
+                        "last_used": entry["last_used"],
+                        "hits": entry["hits"],
+                    }
+                    for name, entry in self.entries.items()
+                ],
+                "retired": [
+                    {"name": retired["name"], "version": retired["version"], "retired_at": retired["retired_at"]}
+                    for retired in self._retired_alive()
+                ],
+            }
@@ -0,0 +1,242 @@
+import hashlib
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def artifact_version(paths):
+    """
+    Version d'un ensemble d'artefacts, calculée à partir de la date de
+    modification et de la taille des fichiers. Un identifiant qui n'est pas un
+    chemin local (ex: modèle du hub Hugging Face) est utilisé tel quel.
+    """
+    parts = []
+    for path in paths:
+        if os.path.isdir(path):
+            stats = [os.stat(os.path.join(root, f)) for root, _, files in os.walk(path) for f in files]
+            parts.append(f"{max((s.st_mtime_ns for s in stats), default=0)}-{sum(s.st_size for s in stats)}")
+        elif os.path.exists(path):
+            stat = os.stat(path)
+            parts.append(f"{stat.st_mtime_ns}-{stat.st_size}")
+        else:
+            parts.append(path)
+    return hashlib.sha1("|".join(parts).encode()).hexdigest()[:12]
+
+
+def text_digest(cleaned):
+    return hashlib.sha256(cleaned.encode("utf-8")).hexdigest()
+
+
+class PredictionCache:
+    """
+    Cache des réponses de /predict, adressé par le contenu : la clé est
+    (modèle, version de l'artefact, hash du texte nettoyé).
+
+    Niveau mémoire LRU avec durée de vie (TTL) et niveau disque SQLite
+    optionnel qui survit aux redémarrages. Quand la version d'un modèle
+    change (fichier réentraîné), ses entrées sont supprimées des deux niveaux.
+
+    La connexion SQLite est ouverte au premier usage, une par processus : une
+    connexion héritée d'un fork (workers de serve.py) n'est jamais réutilisée.
+    Les écritures disque (insertions, purges de version) ne bloquent pas les
+    requêtes : elles sont mises en file et appliquées par lots, dans l'ordre,
+    par un thread d'écriture qui a sa propre connexion. Une erreur SQLite
+    (ex: "database is locked") est comptée dans stats()["errors"] au lieu
+    d'échouer la requête : le niveau disque n'est qu'une accélération.
+    """
+
+    WRITE_BATCH = 256
+
+    def __init__(self, max_entries=10000, ttl_seconds=3600, sqlite_path=None):
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self.entries = OrderedDict()
+        self.versions = {}
+        self.lock = threading.Lock()
+        self.stats_counters = {
+            "hits": 0, "memory_hits": 0, "disk_hits": 0, "misses": 0, "invalidations": 0, "errors": 0}
+        self.sqlite_path = sqlite_path
+        self._db = None
+        self._db_pid = None
+        self._writes = None
+        self._writer = None
+        self._reopen_at = 0.0
+        if sqlite_path:
+            os.makedirs(os.path.dirname(sqlite_path) or ".", exist_ok=True)
+
+    def _connection(self):
+        # Appelé sous self.lock : connexion SQLite du processus courant, ou None
+        if not self.sqlite_path:
+            return None
+        if self._db_pid != os.getpid():
+            self._db = None
+            self._db_pid = os.getpid()
+            self._reopen_at = 0.0
+            # File et thread d'écriture propres au processus (un fork ne copie pas les threads)
+            self._writes = queue.Queue()
+            self._writer = threading.Thread(target=self._write_loop, args=(self._writes,),
+                                            name="prediction-cache-writer", daemon=True)
+            self._writer.start()
+            self._writes.put(("DELETE FROM predictions WHERE expires_at <= ?", (time.time(),)))
+        if self._db is None and time.monotonic() >= self._reopen_at:
+            try:
+                self._db = self._open(timeout=0.1)
+            except sqlite3.Error as exc:
+                # Nouvel essai au plus tôt dans 5 s ; en attendant, niveau mémoire seul
+                self._reopen_at = time.monotonic() + 5
+                self._error("ouverture", exc)
+        return self._db
+
+    def _open(self, timeout):
+        # Connexion des requêtes : attente courte, le thread d'écriture peut attendre plus longtemps
+        db = sqlite3.connect(self.sqlite_path, timeout=timeout, check_same_thread=False)
+        # WAL : les lectures des requêtes ne sont pas bloquées par le thread d'écriture
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS predictions ("
+            "model TEXT, version TEXT, digest TEXT, expires_at REAL, response TEXT, "
+            "PRIMARY KEY (model, version, digest))"
+        )
+        db.commit()
+        return db
+
+    def _enqueue(self, statement, params):
+        # Appelé sous self.lock : écriture disque confiée au thread d'écriture du processus
+        if self.sqlite_path:
+            self._connection()
+            self._writes.put((statement, params))
+
+    def _error(self, operation, exc):
+        # Appelé sous self.lock ; seule la première erreur est affichée, les suivantes sont comptées
+        self.stats_counters["errors"] += 1
+        if self.stats_counters["errors"] == 1:
+            print(f"⚠️ Cache de prédictions SQLite ({operation}) : {exc}")
+
+    def _write_loop(self, writes):
+        # Thread d'écriture : applique les opérations en file par lots, une transaction par lot
+        db = None
+        while True:
+            operation = writes.get()
+            if operation is None:
+                return
+            batch = [operation]
+            while len(batch) < self.WRITE_BATCH:
+                try:
+                    operation = writes.get_nowait()
+                except queue.Empty:
+                    break
+                if operation is None:
+                    writes.put(None)
+                    break
+                batch.append(operation)
+            try:
+                if db is None:
+                    db = self._open(timeout=5)
+                with db:
+                    for statement, params in batch:
+                        db.execute(statement, params)
+            except sqlite3.Error as exc:
+                with self.lock:
+                    self._error("écriture", exc)
+            finally:
+                for _ in batch:
+                    writes.task_done()
+
+    def flush(self, timeout=None):
+        """Attend que les écritures disque en file soient appliquées (tests, arrêt)."""
+        writes = self._writes if self._db_pid == os.getpid() else None
+        if writes is None:
+            return
+        if timeout is None:
+            writes.join()
+            return
+        deadline = time.monotonic() + timeout
+        while writes.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def close(self, timeout=5.0):
+        """Applique les écritures en file puis arrête le thread d'écriture."""
+        with self.lock:
+            if self._db_pid != os.getpid() or self._writer is None:
+                return
+            writes, writer = self._writes, self._writer
+        writes.put(None)
+        writer.join(timeout)
+
+    def _check_version(self, model, version):
+        # Appelé sous self.lock : purge les entrées d'une ancienne version du modèle
+        previous = self.versions.get(model)
+        self.versions[model] = version
+        if previous is None or previous == version:
+            return
+        self.stats_counters["invalidations"] += 1
+        for key in [key for key in self.entries if key[0] == model]:
+            del self.entries[key]
+        self._enqueue("DELETE FROM predictions WHERE model = ? AND version != ?", (model, version))
+
+    def get(self, model, version, cleaned):
+        key = (model, version, text_digest(cleaned))
+        now = time.time()
+        with self.lock:
+            self._check_version(model, version)
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] > now:
+                self.entries.move_to_end(key)
+                self.stats_counters["hits"] += 1
+                self.stats_counters["memory_hits"] += 1
+                return entry[1]
+            if entry is not None:
+                del self.entries[key]
+            db = self._connection()
+            if db is not None:
+                try:
+                    row = db.execute(
+                        "SELECT expires_at, response FROM predictions "
+                        "WHERE model = ? AND version = ? AND digest = ? AND expires_at > ?",
+                        (*key, now),
+                    ).fetchone()
+                except sqlite3.Error as exc:
+                    self._error("lecture", exc)
+                    row = None
+                if row is not None:
+                    response = json.loads(row[1])
+                    self._store_memory(key, row[0], response)
+                    self.stats_counters["hits"] += 1
+                    self.stats_counters["disk_hits"] += 1
+                    return response
+            self.stats_counters["misses"] += 1
+            return None
+
+    def set(self, model, version, cleaned, response):
+        key = (model, version, text_digest(cleaned))
+        expires_at = time.time() + self.ttl
+        with self.lock:
+            self._check_version(model, version)
+            self._store_memory(key, expires_at, response)
+            self._enqueue("INSERT OR REPLACE INTO predictions VALUES (?, ?, ?, ?, ?)",
+                          (*key, expires_at, json.dumps(response)))
+
+    def _store_memory(self, key, expires_at, response):
+        self.entries[key] = (expires_at, response)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def stats(self):
+        with self.lock:
+            lookups = self.stats_counters["hits"] + self.stats_counters["misses"]
+            stats = dict(self.stats_counters)
+            stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else None
+            stats["memory_entries"] = len(self.entries)
+            db = self._connection()
+            if db is not None:
+                try:
+                    stats["disk_entries"] = db.execute("SELECT COUNT(*) FROM predictions").fetchone()[0]
+                except sqlite3.Error as exc:
+                    self._error("lecture", exc)
+                stats["disk_pending_writes"] = self._writes.unfinished_tasks
+            return stats
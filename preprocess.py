@@ -1,8 +1,47 @@
+import multiprocessing
+import os
 import re
 
+# À incrémenter à chaque changement du résultat de clean_text : invalide les
+# caractéristiques mises en cache par feature_cache.py
+CLEANING_VERSION = 1
+
+_URL = re.compile(r"http\S+")
+# Une seule passe pour les liens et les caractères autres que lettres/espaces.
+# Le texte est déjà en minuscules : [^a-z\s] équivaut à [^a-zA-Z\s]. Les deux
+# alternatives ne peuvent pas commencer au même caractère ("h" est une lettre),
+# le résultat est donc celui des deux re.sub successifs.
+_REMOVE = re.compile(r"http\S+|[^a-z\s]+")
+# Cas courant d'un texte ASCII : suppression des caractères spéciaux par table
+# (str.translate), plus rapide que l'expression régulière
+_ASCII_REMOVE = str.maketrans({
+    code: None for code in range(128) if not ("a" <= chr(code) <= "z" or chr(code).isspace())
+})
+
+
 def clean_text(text):
-    text = text.lower()
-    text = re.sub(r"http\S+", "", text)  # remove links
-    text = re.sub(r"[^a-zA-Z\s]", "", text)  # remove special characters
-    text = re.sub(r"\s+", " ", text).strip()  # remove extra spaces
-    return text
+    """Minuscules, suppression des liens et des caractères spéciaux, espaces normalisés."""
+    text = str(text).lower()
+    if text.isascii():
+        if "http" in text:
+            text = _URL.sub("", text)
+        text = text.translate(_ASCII_REMOVE)
+    else:
+        text = _REMOVE.sub("", text)
+    # split() sans argument coupe sur les mêmes espaces que \s et ignore ceux des bords
+    return " ".join(text.split())
+
+
+def clean_texts(texts, workers=1, chunksize=1000):
+    """
+    Nettoie une suite de textes (liste, Series pandas...) et renvoie la liste
+    des textes nettoyés, dans le même ordre. Avec workers > 1 (None = tous les
+    cœurs), les textes sont répartis sur des processus par paquets de
+    `chunksize` ; sans fork (Windows), le nettoyage reste dans ce processus.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers > 1 and "fork" in multiprocessing.get_all_start_methods():
+        with multiprocessing.get_context("fork").Pool(workers) as pool:
+            return pool.map(clean_text, texts, chunksize=chunksize)
+    return [clean_text(text) for text in texts]
@@ -1,34 +1,13 @@
-import pandas as pd
-import re
-from sklearn.model_selection import train_test_split
-from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import accuracy_score, classification_report
+from feature_cache import load_features
 
-# Fonction de nettoyage
-def clean_text(text):
-    text = str(text).lower()
-    text = re.sub(r"http\S+", "", text)
-    text = re.sub(r"[^a-zA-Z\s]", "", text)
-    return text
+# Chargement, nettoyage, séparation train/test et TF-IDF (cache partagé)
+features = load_features("data/all_news_cleaned.csv")
+X_train_tfidf, X_test_tfidf = features.X_train, features.X_test
+y_train, y_test = features.y_train, features.y_test
 
-# Chargement du dataset
-df = pd.read_csv("data/all_news_cleaned.csv")
-df.columns = df.columns.str.strip()
-
-print("Colonnes :", df.columns)
-print("Répartition des classes :", df['label'].value_counts())
-
-# Nettoyage du texte
-df['text'] = df['text'].apply(clean_text)
-
-# Séparation train/test
-X_train, X_test, y_train, y_test = train_test_split(df['text'], df['label'], test_size=0.2, random_state=42)
-
-# TF-IDF vectorization
-vectorizer = TfidfVectorizer(stop_words="english", max_features=10000)
-X_train_tfidf = vectorizer.fit_transform(X_train)
-X_test_tfidf = vectorizer.transform(X_test)
+print("Répartition des classes (train) :", y_train.value_counts())
 
 # Entraînement Random Forest
 print("Entraînement du modèle Random Forest...")
@@ -0,0 +1,72 @@
+"""
+Rejoue un fichier .jsonl local à travers l'endpoint /predict/stream de l'API.
+
+Le fichier est lu et envoyé ligne par ligne (transfert chunked) et les
+résultats NDJSON sont écrits au fur et à mesure : ni le fichier d'entrée ni
+les résultats ne sont chargés entièrement en mémoire.
+
+Exemples :
+    python replay_jsonl.py articles.jsonl --model xgboost --output results/predictions.jsonl
+    python replay_jsonl.py requests.jsonl --text-field body
+"""
+
+import argparse
+import json
+import sys
+import time
+
+import requests
+
+
+def iter_payload(path, text_field, default_model, stats):
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            payload = {"text": record.get(text_field, ""), "model": record.get("model", default_model)}
+            stats["sent"] += 1
+            yield (json.dumps(payload) + "\n").encode("utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rejoue un fichier .jsonl via /predict/stream")
+    parser.add_argument("path", help="fichier .jsonl à rejouer")
+    parser.add_argument("--url", default="http://127.0.0.1:8000/predict/stream")
+    parser.add_argument("--model", default="randomforest", help="modèle des lignes sans champ 'model'")
+    parser.add_argument("--text-field", default="text", help="champ contenant le texte à analyser")
+    parser.add_argument("--output", help="fichier de sortie NDJSON (par défaut : sortie standard)")
+    args = parser.parse_args()
+
+    stats = {"sent": 0, "received": 0, "errors": 0}
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    start = time.perf_counter()
+    try:
+        response = requests.post(
+            args.url,
+            data=iter_payload(args.path, args.text_field, args.model, stats),
+            headers={"Content-Type": "application/x-ndjson"},
+            stream=True,
+        )
+        response.raise_for_status()
+        for line in response.iter_lines():
+            if not line:
+                continue
+            stats["received"] += 1
+            if "error" in json.loads(line):
+                stats["errors"] += 1
+            output.write(line.decode("utf-8") + "\n")
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    elapsed = time.perf_counter() - start
+    print(
+        f"{stats['received']}/{stats['sent']} lignes traitées en {elapsed:.1f}s "
+        f"({stats['received'] / elapsed:.0f} lignes/s), {stats['errors']} erreurs",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -10,73 +10,139 @@ Ajouts :
 - Ajout de logs pour le suivi des étapes.
 - Possibilité de sous-échantillonner pour des tests rapides.
 - Équilibrage de classes désactivé par défaut pour accélérer.
+- Traitement en flux : lecture par morceaux, nettoyage sur plusieurs processus,
+  écriture au fil de l'eau (mémoire indépendante de la taille des datasets).
 
 Auteur: Votre nom
 Date: YYYY-MM-DD
 """
 
+import itertools
+import multiprocessing
+from collections import Counter, deque
+
+import numpy as np
 import pandas as pd
-import re
 from sklearn.feature_extraction.text import TfidfVectorizer
 import joblib
 import os
+import sys
+
+# preprocess.py est à la racine du projet
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from preprocess import clean_texts
 
+# Les fichiers sont traités en flux, par morceaux de CHUNKSIZE lignes : la
+# mémoire dépend de la taille des morceaux et du nombre de processus, pas de
+# la taille des datasets.
+CHUNKSIZE = 10000
 
-def clean_text(text):
-    text = text.lower()
-    text = re.sub(r"http\S+", "", text)       # Supprime les URLs
-    text = re.sub(r"[^a-zA-Z\s]", "", text)     # Conserve seulement les lettres et les espaces
-    return text
+
+def clean_chunk(chunk, label_value=None):
+    """Ajoute la colonne cleaned_text (et le label) à un morceau du dataset."""
+    chunk['cleaned_text'] = clean_texts(chunk['text'])
+    if label_value is not None:
+        chunk['label'] = label_value
+    return chunk
 
 
-def preprocess_dataset(input_csv, label_value=None):
+def preprocess_dataset(input_csv, label_value=None, chunksize=CHUNKSIZE, sample_frac=None, pool=None, max_pending=2):
+    """
+    Morceaux nettoyés du fichier, dans l'ordre. Avec un pool de processus, les
+    morceaux sont nettoyés en parallèle, au plus max_pending à la fois (lecture
+    du fichier suspendue au-delà).
+    """
     try:
-        df = pd.read_csv(input_csv)
+        reader = pd.read_csv(input_csv, chunksize=chunksize)
+        first = next(reader, None)
     except Exception as e:
         print(f"Erreur lors du chargement du fichier {input_csv} : {e}")
-        return None
+        return
 
-    if 'text' not in df.columns:
+    if first is None or 'text' not in first.columns:
         print(f"Le dataset {input_csv} doit contenir une colonne 'text'.")
-        return None
+        return
 
     print(f"Nettoyage des textes du fichier {input_csv} en cours...")
-    df['cleaned_text'] = df['text'].apply(clean_text)
-
-    if label_value is not None:
-        df['label'] = label_value
+    if sample_frac:
+        print(f"Sous-échantillonnage à {sample_frac*100:.0f}% pour {input_csv}")
+    random_state = np.random.RandomState(42)
+    pending = deque()
+    for chunk in itertools.chain([first], reader):
+        if sample_frac:
+            chunk = chunk.sample(frac=sample_frac, random_state=random_state)
+        if pool is None:
+            yield clean_chunk(chunk, label_value)
+            continue
+        pending.append(pool.apply_async(clean_chunk, (chunk, label_value)))
+        if len(pending) >= max_pending:
+            yield pending.popleft().get()
+    while pending:
+        yield pending.popleft().get()
+
+
+def combine_datasets(dataset_info, output_csv, vectorizer_path=None, sample_frac=None, chunksize=CHUNKSIZE,
+                     workers=None):
+    """
+    Nettoie et concatène les datasets en flux : chaque morceau est nettoyé
+    dans un pool de `workers` processus (None = tous les cœurs) puis ajouté au
+    CSV de sortie, et la distribution des classes est comptée au passage.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    pool = None
+    if workers > 1 and "fork" in multiprocessing.get_all_start_methods():
+        pool = multiprocessing.get_context("fork").Pool(workers)
 
-    return df
-
-
-def combine_datasets(dataset_info, output_csv, vectorizer_path=None, sample_frac=None):
-    dfs = []
-    for input_csv, label in dataset_info:
-        df = preprocess_dataset(input_csv, label_value=label)
-        if df is not None:
-            if sample_frac:
-                df = df.sample(frac=sample_frac, random_state=42)
-                print(f"Sous-échantillonnage à {sample_frac*100:.0f}% pour {input_csv}")
-            dfs.append(df)
-
-    if not dfs:
+    os.makedirs(os.path.dirname(output_csv), exist_ok=True)
+    # Écriture dans un fichier temporaire : le CSV précédent reste intact si le traitement échoue
+    tmp_csv = f"{output_csv}.tmp"
+    columns = None
+    class_counts = Counter()
+    rows = 0
+    try:
+        with open(tmp_csv, "w", newline="", encoding="utf-8") as out:
+            for input_csv, label in dataset_info:
+                file_rows = rows
+                for chunk in preprocess_dataset(input_csv, label_value=label, chunksize=chunksize,
+                                                sample_frac=sample_frac, pool=pool,
+                                                max_pending=2 * workers):
+                    if columns is None:
+                        columns = chunk.columns.tolist()
+                        chunk.to_csv(out, index=False)
+                    else:
+                        # Colonnes du premier fichier, dans le même ordre (absentes : vides)
+                        chunk.reindex(columns=columns).to_csv(out, index=False, header=False)
+                    class_counts.update(chunk['label'].tolist())
+                    rows += len(chunk)
+                if rows > file_rows:
+                    print(f"{rows - file_rows} lignes de {input_csv} écrites")
+    finally:
+        if pool is not None:
+            pool.terminate()
+
+    if columns is None:
+        os.remove(tmp_csv)
         print("Aucun dataset n'a pu être chargé.")
         return
-
-    combined_df = pd.concat(dfs, ignore_index=True)
+    os.replace(tmp_csv, output_csv)
 
     print("\nStatistiques sur les données combinées :")
-    print("Colonnes :", combined_df.columns)
-    print("Distribution des classes :\n", combined_df['label'].value_counts())
+    print("Colonnes :", columns)
+    print("Distribution des classes :\n", pd.Series(class_counts, name="count").rename_axis("label").sort_index())
 
-    os.makedirs(os.path.dirname(output_csv), exist_ok=True)
-    combined_df.to_csv(output_csv, index=False)
     print(f"\nDataset combiné nettoyé sauvegardé dans '{output_csv}'.")
 
     if vectorizer_path is not None:
         print("\nVectorisation TF-IDF en cours...")
+        # Textes relus par morceaux depuis le CSV écrit, sans le recharger en entier
+        texts = (
+            text
+            for chunk in pd.read_csv(output_csv, usecols=['cleaned_text'], chunksize=chunksize)
+            for text in chunk['cleaned_text'].fillna('')
+        )
         vectorizer = TfidfVectorizer(stop_words='english', max_features=10000)
-        vectorizer.fit(combined_df['cleaned_text'])
+        vectorizer.fit(texts)
         os.makedirs(os.path.dirname(vectorizer_path), exist_ok=True)
         joblib.dump(vectorizer, vectorizer_path)
         print(f"TF-IDF vectorizer sauvegardé dans '{vectorizer_path}'.")
@@ -1,53 +1,28 @@
-import pandas as pd
-import re
-from sklearn.model_selection import train_test_split
-from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import accuracy_score, classification_report
 import joblib
 from imblearn.over_sampling import SMOTE
-
-def clean_text(text):
-    """Prétraitement : minuscule, suppression URLs, caractères spéciaux."""
-    text = str(text).lower()
-    text = re.sub(r"http\S+", "", text)
-    text = re.sub(r"[^a-zA-Z\s]", "", text)
-    return text
-
-# ========== 1. Chargement du dataset ==========
-print("Chargement du dataset all_news_cleaned.csv...")
-df = pd.read_csv("data/all_news_cleaned.csv")
-df.columns = df.columns.str.strip()
-print("Colonnes du dataset : ", df.columns.tolist())
-
-# ========== 2. Optionnel : Sous-échantillonnage pour tests rapides ==========
-# Décommente pour activer (ex: pour tests rapides)
-df = df.sample(frac=0.2, random_state=42)
-print(f"Dataset réduit pour test rapide : {df.shape[0]} lignes")
-
-# ========== 3. Vérification classes ==========
-print("Répartition des classes dans 'label' :")
-print(df['label'].value_counts())
-
-# ========== 4. Nettoyage texte ==========
-print("Nettoyage des textes...")
-df['text'] = df['text'].astype(str).apply(clean_text)
-
-# ========== 5. Split des données ==========
-print("Séparation en train/test...")
-X_train, X_test, y_train, y_test = train_test_split(df['text'], df['label'], test_size=0.2, random_state=42)
-
+import os
+import sys
+
+# feature_cache.py est à la racine du projet
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from feature_cache import load_features
+
+# ========== 1. Chargement, sous-échantillonnage, nettoyage, split et TF-IDF ==========
+# Relus depuis le cache partagé par les scripts d'entraînement s'ils existent.
+# sample_frac=0.2 : dataset réduit pour test rapide (None pour le dataset complet)
+print("Chargement des caractéristiques de all_news_cleaned.csv...")
+features = load_features("data/all_news_cleaned.csv", sample_frac=0.2)
+X_train_tfidf, X_test_tfidf = features.X_train, features.X_test
+y_train, y_test, vectorizer = features.y_train, features.y_test, features.vectorizer
+print(f"Dataset réduit pour test rapide : {X_train_tfidf.shape[0] + X_test_tfidf.shape[0]} lignes")
+
+# ========== 2. Vérification classes ==========
 print("Répartition des classes dans y_train :")
 print(y_train.value_counts())
 
-# ========== 6. Vectorisation TF-IDF ==========
-print("Vectorisation TF-IDF en cours...")
-vectorizer = TfidfVectorizer(stop_words="english", max_features=10000)
-X_train_tfidf = vectorizer.fit_transform(X_train)
-X_test_tfidf = vectorizer.transform(X_test)
-print("TF-IDF vectorization terminée.")
-
-# ========== 7. Application de SMOTE (optionnel) ==========
+# ========== 3. Application de SMOTE (optionnel) ==========
 USE_SMOTE = True  # Passe à False si tu veux désactiver SMOTE
 
 if USE_SMOTE and len(y_train.value_counts()) > 1:
@@ -59,20 +34,22 @@ else:
     print("SMOTE désactivé ou classes insuffisantes.")
     X_train_smote, y_train_smote = X_train_tfidf, y_train
 
-# ========== 8. Entraînement du modèle ==========
+# ========== 4. Entraînement du modèle ==========
 print("Entraînement du modèle LogisticRegression...")
 clf = LogisticRegression(max_iter=1000)
 clf.fit(X_train_smote, y_train_smote)
 print("Entraînement terminé.")
 
-# ========== 9. Évaluation ==========
+# ========== 5. Évaluation ==========
 print("Évaluation du modèle...")
 y_pred = clf.predict(X_test_tfidf)
 print("Accuracy: ", accuracy_score(y_test, y_pred))
 print("Rapport de classification :\n", classification_report(y_test, y_pred))
 
-# ========== 10. Sauvegarde ==========
+# ========== 6. Sauvegarde ==========
 print("Sauvegarde du modèle et du vectorizer...")
 joblib.dump(clf, "model/fake_news_classifier.pkl")
-joblib.dump(vectorizer, "model/tfidf_vectorizer.pkl")
+# Vectoriseur propre à ce modèle (ajusté sur l'échantillon) : ne pas écraser
+# model/tfidf_vectorizer.pkl, partagé par les modèles à arbres
+joblib.dump(vectorizer, "model/logreg_tfidf_vectorizer.pkl")
 print("Modèle et vectorizer sauvegardés dans /model.")
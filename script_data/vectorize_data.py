@@ -3,18 +3,26 @@
 import pandas as pd
 import joblib
 import os
+import sys
 from sklearn.model_selection import train_test_split
 
+# feature_store.py est à la racine du projet
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from feature_store import save_split
+
 # Chemins des fichiers
 input_csv_path = "data/all_news_cleaned.csv"
 vectorizer_path = "model/tfidf_vectorizer.pkl"
+# Tableaux .npy bruts + manifest.json, relus sans copie avec feature_store.open_split
+# (remplace l'ancien tuple picklé model/tfidf_data_split.pkl)
+output_dir = "model/tfidf_data_split"
 
 # Chargement des données nettoyées
 df = pd.read_csv(input_csv_path)
 print(f"{len(df)} lignes chargées depuis {input_csv_path}")
 
 # Vérification des NaN dans la colonne 'cleaned_text' et suppression ou remplacement
-df['cleaned_text'].fillna('', inplace=True)  # Remplacer les NaN par une chaîne vide
+df['cleaned_text'] = df['cleaned_text'].fillna('')  # Remplacer les NaN par une chaîne vide
 # df = df.dropna(subset=['cleaned_text'])  # Alternative : supprimer les lignes avec NaN
 
 # Chargement du vectorizer TF-IDF
@@ -30,6 +38,6 @@ print(f"Exemple de label : {y[:5]}")
 # Optionnel : division en train/test
 X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
 
-# Sauvegarde des jeux de données
-joblib.dump((X_train, X_test, y_train, y_test), "model/tfidf_data_split.pkl")
-print("Enregistrement terminé dans 'model/tfidf_data_split.pkl'")
+# Sauvegarde des jeux de données (valeurs en float32 : moitié moins de place)
+save_split(output_dir, {"train": (X_train, y_train), "test": (X_test, y_test)})
+print(f"Enregistrement terminé dans '{output_dir}'")
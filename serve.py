@@ -0,0 +1,169 @@
+"""
+Serveur multi-workers en pré-fork pour l'API FastAPI.
+
+Contrairement à `uvicorn main:app --workers N`, qui relance un interpréteur
+par worker et recharge donc tous les modèles N fois, ce script charge le
+vectoriseur, les modèles à base d'arbres et BERT une seule fois dans le
+processus parent, puis crée les workers avec fork(). Les pages mémoire des
+modèles restent partagées entre les workers (copy-on-write) :
+- les pickles joblib sont chargés avec mmap_mode="r", leurs tableaux NumPy
+  sont alors projetés depuis le fichier et partagés par le cache disque ;
+- les tenseurs PyTorch sont placés en mémoire partagée (share_memory()) ;
+- gc.freeze() évite que le ramasse-miettes des workers ne réécrive les en-têtes
+  des objets hérités du parent, ce qui dupliquerait leurs pages.
+
+Linux/macOS uniquement (os.fork).
+
+Exemple :
+    python serve.py --workers 8 --port 8000
+"""
+
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+
+
+def process_memory(pid):
+    """
+    Mémoire d'un processus d'après /proc/<pid>/smaps_rollup (en Mo) :
+    RSS, PSS (part proportionnelle des pages partagées) et USS (pages propres
+    au processus, c'est-à-dire la mémoire libérée si on le tue).
+    """
+    values = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].endswith(":") and parts[1].isdigit():
+                    values[parts[0][:-1]] = int(parts[1])
+    except OSError:
+        return None
+    return {
+        "rss_mb": round(values.get("Rss", 0) / 1024, 1),
+        "pss_mb": round(values.get("Pss", 0) / 1024, 1),
+        "uss_mb": round((values.get("Private_Clean", 0) + values.get("Private_Dirty", 0)) / 1024, 1),
+    }
+
+
+def print_memory_report(parent_pid, worker_pids):
+    print("\nMémoire par processus (Mo) :")
+    print(f"{'processus':<18}{'RSS':>10}{'PSS':>10}{'USS':>10}")
+    total_uss = 0
+    for label, pid in [("parent", parent_pid)] + [(f"worker {pid}", pid) for pid in worker_pids]:
+        memory = process_memory(pid)
+        if memory is None:
+            print(f"{label:<18}{'indisponible':>30}")
+            continue
+        total_uss += memory["uss_mb"]
+        print(f"{label:<18}{memory['rss_mb']:>10}{memory['pss_mb']:>10}{memory['uss_mb']:>10}")
+    print(f"USS total : {total_uss:.1f} Mo\n")
+    sys.stdout.flush()
+
+
+def share_model_memory(registry):
+    """Place les poids des modèles PyTorch chargés en mémoire partagée."""
+    with registry.lock:
+        models = [entry["model"] for entry in registry.entries.values()]
+    for model in models:
+        torch_model = getattr(model, "model", None)
+        if hasattr(torch_model, "share_memory"):
+            torch_model.share_memory()
+
+
+def run_worker(app, sock, torch_threads):
+    import uvicorn
+
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    if "torch" in sys.modules and torch_threads:
+        # Sans limite, chaque worker utiliserait tous les cœurs pour BERT
+        sys.modules["torch"].set_num_threads(torch_threads)
+    server = uvicorn.Server(uvicorn.Config(app, log_level="info"))
+    server.run(sockets=[sock])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serveur pré-fork de l'API de détection de fake news")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--preload", default="",
+                        help="modèles chargés avant le fork, séparés par des virgules (par défaut : tous)")
+    parser.add_argument("--torch-threads", type=int, default=1, help="threads PyTorch par worker")
+    parser.add_argument("--memory-report-delay", type=float, default=10,
+                        help="délai (s) avant d'afficher la mémoire par worker ; 0 = jamais (SIGUSR1 l'affiche aussi)")
+    args = parser.parse_args()
+
+    if not hasattr(os, "fork"):
+        sys.exit("serve.py nécessite os.fork (Linux/macOS) ; utiliser `uvicorn main:app` sous Windows.")
+
+    # Doit être défini avant l'import de main/config
+    os.environ.setdefault("JOBLIB_MMAP_MODE", "r")
+    import main as api
+
+    start = time.perf_counter()
+    names = [name.strip() for name in args.preload.split(",") if name.strip()] or sorted(api.registry.loaders)
+    api.registry.preload(names)
+    share_model_memory(api.registry)
+    print(f"{len(names)} modèles chargés dans le parent en {time.perf_counter() - start:.1f}s")
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((args.host, args.port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+
+    # Tout ce qui existe à ce stade est considéré comme permanent par le GC
+    gc.collect()
+    gc.freeze()
+
+    workers = set()
+    stopping = False
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            try:
+                run_worker(api.app, sock, args.torch_threads)
+            finally:
+                os._exit(0)
+        workers.add(pid)
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    for _ in range(args.workers):
+        spawn()
+    print(f"{args.workers} workers démarrés sur http://{args.host}:{args.port}")
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGUSR1, lambda signum, frame: print_memory_report(os.getpid(), sorted(workers)))
+    if args.memory_report_delay > 0:
+        signal.signal(signal.SIGALRM, lambda signum, frame: print_memory_report(os.getpid(), sorted(workers)))
+        signal.setitimer(signal.ITIMER_REAL, args.memory_report_delay)
+
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        workers.discard(pid)
+        if not stopping:
+            print(f"Worker {pid} arrêté (statut {status}), redémarrage...")
+            spawn()
+    sock.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import asyncio
+import threading
+import time
+
+
+class SingleFlight:
+    """
+    Regroupement des requêtes identiques en cours ("single-flight").
+
+    La première requête pour une clé lance le calcul ; les requêtes identiques
+    qui arrivent avant la fin attendent ce même calcul et reçoivent son
+    résultat au lieu de relancer le modèle. La clé est un tuple dont le
+    premier élément est le nom du modèle, pour compter le travail économisé
+    par modèle.
+    """
+
+    def __init__(self, on_coalesced=None):
+        self.calls = {}
+        self.executions = {}
+        self.coalesced = {}
+        self.saved_seconds = {}
+        self.lock = threading.Lock()
+        # Appelée avec (modèle, durée du calcul partagé) pour chaque requête regroupée
+        self.on_coalesced = on_coalesced
+
+    async def do(self, key, fn, *args):
+        model = key[0]
+        future = self.calls.get(key)
+        if future is None:
+            # Le calcul est une tâche à part : si le client qui l'a lancé se
+            # déconnecte, les autres requêtes reçoivent quand même le résultat
+            future = asyncio.ensure_future(self._execute(fn, *args))
+            self.calls[key] = future
+            future.add_done_callback(lambda done: self._done(key, done))
+            with self.lock:
+                self.executions[model] = self.executions.get(model, 0) + 1
+            result, _ = await asyncio.shield(future)
+            return result
+
+        result, seconds = await asyncio.shield(future)
+        with self.lock:
+            self.coalesced[model] = self.coalesced.get(model, 0) + 1
+            self.saved_seconds[model] = self.saved_seconds.get(model, 0.0) + seconds
+        if self.on_coalesced is not None:
+            self.on_coalesced(model, seconds)
+        return result
+
+    async def _execute(self, fn, *args):
+        start = time.perf_counter()
+        result = await fn(*args)
+        return result, time.perf_counter() - start
+
+    def _done(self, key, future):
+        self.calls.pop(key, None)
+        if not future.cancelled():
+            # Marque l'exception comme lue si plus personne n'attend le calcul
+            future.exception()
+
+    def in_flight(self):
+        return len(self.calls)
+
+    def stats(self):
+        with self.lock:
+            models = sorted(set(self.executions) | set(self.coalesced))
+            return {
+                "in_flight": self.in_flight(),
+                "models": {
+                    model: {
+                        "executions": self.executions.get(model, 0),
+                        "coalesced": self.coalesced.get(model, 0),
+                        "saved_seconds": round(self.saved_seconds.get(model, 0.0), 3),
+                    }
+                    for model in models
+                },
+            }
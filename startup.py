@@ -0,0 +1,120 @@
+import importlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Modules des classes picklées (modèles et vectoriseurs). Importés avant le
+# chargement parallèle : sinon plusieurs joblib.load importent le même module
+# en même temps et l'un d'eux voit un module partiellement initialisé
+# (ImportError, _DeadlockError).
+MODEL_MODULES = (
+    "sklearn.feature_extraction.text",
+    "sklearn.ensemble",
+    "sklearn.linear_model",
+    "xgboost",
+)
+
+
+def import_model_modules(modules=MODEL_MODULES):
+    for module in modules:
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            # Dépendance optionnelle absente : le modèle concerné échouera seul au chargement
+            pass
+
+
+def enable_offline_mode():
+    """
+    Interdit tout accès au hub Hugging Face : les modèles doivent être lus
+    depuis des dossiers locaux (model/...). À appeler avant d'importer transformers.
+    """
+    os.environ["HF_HUB_OFFLINE"] = "1"
+    os.environ["TRANSFORMERS_OFFLINE"] = "1"
+
+
+class Startup:
+    """
+    Démarrage du service : chargement en parallèle des modèles préchargés,
+    une inférence de warm-up par modèle, puis passage à l'état "prêt" exposé
+    par la sonde de disponibilité (readiness). Les durées de chaque étape sont
+    conservées et affichées à la fin. Un modèle dont le chargement ou le
+    warm-up a échoué est retenté en arrière-plan (délai doublé à chaque essai)
+    jusqu'à ce que le service soit prêt.
+    """
+
+    def __init__(self, import_seconds=None):
+        self.ready = False
+        self.timings = {}
+        self.errors = {}
+        self.stopped = threading.Event()
+        if import_seconds is not None:
+            self.timings["imports"] = import_seconds
+
+    def _timed(self, stage, fn, *args):
+        start = time.perf_counter()
+        try:
+            fn(*args)
+        except Exception as e:
+            self.errors[stage] = f"{type(e).__name__}: {e}"
+        finally:
+            self.timings[stage] = time.perf_counter() - start
+
+    def run(self, registry, names, warm_up, parallel=True, retry_delay=1.0, max_retry_delay=60.0):
+        start = time.perf_counter()
+        if names:
+            import_start = time.perf_counter()
+            import_model_modules()
+            self.timings["imports:models"] = time.perf_counter() - import_start
+            # Désérialisation des pickles et lecture des poids BERT en parallèle
+            with ThreadPoolExecutor(max_workers=len(names) if parallel else 1) as pool:
+                for name in names:
+                    pool.submit(self._timed, f"load:{name}", registry.get, name)
+        self.timings["load_total"] = time.perf_counter() - start
+
+        warm_up_start = time.perf_counter()
+        for name in names:
+            if f"load:{name}" not in self.errors:
+                self._timed(f"warm_up:{name}", warm_up, name)
+        self.timings["warm_up_total"] = time.perf_counter() - warm_up_start
+        self.timings["startup_total"] = time.perf_counter() - start
+
+        self.ready = not self.errors
+        self.print_report()
+
+        delay = retry_delay
+        while self.errors and not self.stopped.wait(delay):
+            self.retry_failed(registry, warm_up)
+            delay = min(delay * 2, max_retry_delay)
+
+    def retry_failed(self, registry, warm_up):
+        """Nouvel essai (chargement puis warm-up) des modèles en erreur."""
+        failed = sorted({stage.split(":", 1)[1] for stage in self.errors})
+        for name in failed:
+            self.errors.pop(f"load:{name}", None)
+            self.errors.pop(f"warm_up:{name}", None)
+            self._timed(f"load:{name}", registry.get, name)
+            if f"load:{name}" not in self.errors:
+                self._timed(f"warm_up:{name}", warm_up, name)
+        if not self.errors:
+            self.ready = True
+            print(f"Prêt après un nouvel essai de {', '.join(failed)}.")
+
+    def stop(self):
+        self.stopped.set()
+
+    def print_report(self):
+        print("\nDémarrage de l'API (durées en secondes) :")
+        for stage, seconds in self.timings.items():
+            print(f"  {stage:<32}{seconds:>8.3f}")
+        for stage, error in self.errors.items():
+            print(f"  ERREUR {stage} : {error}")
+        print("Prêt." if self.ready else "Non prêt : voir les erreurs ci-dessus.")
+
+    def status(self):
+        return {
+            "ready": self.ready,
+            "timings_s": {stage: round(seconds, 3) for stage, seconds in self.timings.items()},
+            "errors": dict(self.errors),
+        }
@@ -0,0 +1,107 @@
+"""
+Entraînement hors mémoire (out-of-core) pour les corpus qui ne tiennent pas en RAM.
+
+Le CSV est lu par morceaux de --chunk-size lignes, jamais en entier :
+    1. premier passage : fréquences documentaires du vectoriseur TF-IDF à
+       hachage (hashing_tfidf.py), sur les lignes d'entraînement ;
+    2. passages suivants (--epochs) : chaque morceau est vectorisé puis
+       appris par un SGDClassifier (régression logistique) avec partial_fit ;
+    3. évaluation sur les lignes de test, comptée morceau par morceau.
+
+Le split train/test est déterministe (numéro de ligne haché), sans avoir à
+charger le corpus. La mémoire dépend de --chunk-size et de --n-features,
+pas de la taille du corpus.
+
+Les artefacts (model/sgd_hashing_fake_news.pkl et
+model/hashing_tfidf_vectorizer.pkl) sont servis par l'API avec model="sgd".
+
+Exemple :
+    python train_model_streaming.py --chunk-size 20000 --epochs 2
+"""
+
+import argparse
+import os
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import SGDClassifier
+
+import config
+from hashing_tfidf import HashingTfidfVectorizer
+from preprocess import clean_texts
+
+CLASSES = np.array([0, 1])
+
+
+def iter_chunks(path, chunk_size, test_size, workers):
+    """Morceaux (textes nettoyés, labels, masque des lignes de test) du CSV."""
+    first_row = 0
+    for chunk in pd.read_csv(path, usecols=["text", "label"], chunksize=chunk_size):
+        rows = np.arange(first_row, first_row + len(chunk), dtype=np.uint64)
+        first_row += len(chunk)
+        # Hachage multiplicatif du numéro de ligne : même split à chaque passage
+        is_test = (rows * np.uint64(2654435761)) % np.uint64(1000) < int(test_size * 1000)
+        texts = clean_texts(chunk["text"].astype(str), workers=workers)
+        yield np.array(texts, dtype=object), chunk["label"].to_numpy(), is_test
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Entraînement hors mémoire (hachage + TF-IDF incrémental + SGD)")
+    parser.add_argument("--data", default="data/all_news_cleaned.csv")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="lignes lues à la fois")
+    parser.add_argument("--n-features", type=int, default=2 ** 20, help="taille de l'espace de hachage")
+    parser.add_argument("--epochs", type=int, default=1, help="passages d'apprentissage sur le corpus")
+    parser.add_argument("--alpha", type=float, default=1e-6, help="régularisation du SGDClassifier")
+    parser.add_argument("--test-size", type=float, default=0.2)
+    parser.add_argument("--workers", type=int, default=None, help="processus de nettoyage (défaut : tous les cœurs)")
+    parser.add_argument("--model-output", default=config.MODEL_PATHS["sgd"])
+    parser.add_argument("--vectorizer-output", default=config.MODEL_PATHS["hashing_vectorizer"])
+    args = parser.parse_args()
+
+    # ========== 1. Fréquences documentaires ==========
+    start = time.perf_counter()
+    vectorizer = HashingTfidfVectorizer(n_features=args.n_features)
+    for texts, _, is_test in iter_chunks(args.data, args.chunk_size, args.test_size, args.workers):
+        vectorizer.partial_fit(texts[~is_test])
+    print(f"IDF calculé sur {vectorizer.n_documents} documents en {time.perf_counter() - start:.1f}s")
+
+    # ========== 2. Apprentissage par morceaux ==========
+    clf = SGDClassifier(loss="log_loss", alpha=args.alpha, random_state=42)
+    rng = np.random.RandomState(42)
+    for epoch in range(args.epochs):
+        start = time.perf_counter()
+        seen = 0
+        for texts, labels, is_test in iter_chunks(args.data, args.chunk_size, args.test_size, args.workers):
+            train = np.flatnonzero(~is_test)
+            if train.size == 0:
+                continue
+            rng.shuffle(train)
+            clf.partial_fit(vectorizer.transform(texts[train]), labels[train], classes=CLASSES)
+            seen += train.size
+        print(f"Époque {epoch + 1}/{args.epochs} : {seen} documents en {time.perf_counter() - start:.1f}s")
+
+    # ========== 3. Évaluation ==========
+    confusion = np.zeros((2, 2), dtype=np.int64)
+    for texts, labels, is_test in iter_chunks(args.data, args.chunk_size, args.test_size, args.workers):
+        if is_test.any():
+            predictions = clf.predict(vectorizer.transform(texts[is_test]))
+            np.add.at(confusion, (labels[is_test], predictions), 1)
+    total = confusion.sum()
+    print(f"Accuracy : {np.trace(confusion) / total:.4f} sur {total} documents de test")
+    for label, name in ((0, "REAL"), (1, "FAKE")):
+        precision = confusion[label, label] / max(1, confusion[:, label].sum())
+        recall = confusion[label, label] / max(1, confusion[label].sum())
+        print(f"  {name} : précision {precision:.4f}, rappel {recall:.4f}")
+
+    # ========== 4. Sauvegarde ==========
+    os.makedirs(os.path.dirname(args.model_output) or ".", exist_ok=True)
+    vectorizer.idf()
+    joblib.dump(clf, args.model_output)
+    joblib.dump(vectorizer, args.vectorizer_output)
+    print(f"Modèle sauvegardé dans {args.model_output}, vectoriseur dans {args.vectorizer_output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+Moteur d'inférence compilé pour les modèles RandomForest et GradientBoosting.
+
+Les arbres scikit-learn entraînés sont aplatis en tableaux NumPy contigus
+(fils gauche/droit, variable, seuil, valeur) qui couvrent tous les arbres du
+modèle. Un batch de lignes CSR est alors évalué en parcourant tous les arbres
+en même temps, un niveau de profondeur par itération (seuls les couples
+ligne/arbre pas encore arrivés sur une feuille sont traités), sans la
+surcharge par appel et par arbre de predict_proba.
+
+Seules les colonnes TF-IDF réellement utilisées par les arbres sont extraites
+de la matrice creuse. Les comparaisons se font en float32 comme dans
+scikit-learn, les probabilités sont donc identiques à la précision flottante près.
+"""
+
+import numpy as np
+import scipy.sparse as sp
+
+# Nombre de lignes évaluées ensemble (borne la mémoire des tableaux intermédiaires)
+CHUNK_SIZE = 512
+# Au-delà de cette taille de batch, les boucles C de scikit-learn redeviennent
+# plus rapides que le parcours NumPy : predict_proba délègue au modèle d'origine
+MAX_COMPILED_BATCH = 64
+
+
+def compile_trees(trees):
+    """
+    Concatène des arbres sklearn (objets `tree_`) en tableaux plats.
+
+    Les feuilles bouclent sur elles-mêmes (fils gauche = fils droit = feuille,
+    seuil infini) : une ligne arrivée sur une feuille n'en bouge plus, ce qui
+    permet de la retirer du parcours.
+    """
+    lefts, rights, features, thresholds, roots = [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for tree in trees:
+        index = np.arange(tree.node_count, dtype=np.intp)
+        leaf = tree.children_left == -1
+        lefts.append(np.where(leaf, index, tree.children_left) + offset)
+        rights.append(np.where(leaf, index, tree.children_right) + offset)
+        features.append(np.where(leaf, -1, tree.feature))
+        thresholds.append(np.where(leaf, np.inf, tree.threshold))
+        roots.append(offset)
+        offset += tree.node_count
+        max_depth = max(max_depth, tree.max_depth)
+
+    feature = np.concatenate(features)
+    # Colonnes utilisées par au moins un nœud interne, renumérotées de 0 à n-1
+    used_features = np.unique(feature[feature >= 0])
+    if used_features.size == 0:
+        used_features = np.array([0])
+    compact_feature = np.where(feature >= 0, np.searchsorted(used_features, feature), 0)
+    return {
+        "left": np.concatenate(lefts).astype(np.intp),
+        "right": np.concatenate(rights).astype(np.intp),
+        "feature": compact_feature.astype(np.intp),
+        "threshold": np.concatenate(thresholds).astype(np.float64),
+        "roots": np.array(roots, dtype=np.intp),
+        "used_features": used_features,
+        "max_depth": max_depth,
+    }
+
+
+class CompiledTreeEnsemble:
+    def __init__(self, model, trees, max_compiled_batch=MAX_COMPILED_BATCH):
+        arrays = compile_trees(trees)
+        self.model = model
+        self.max_compiled_batch = max_compiled_batch
+        self.classes_ = model.classes_
+        self.n_features_in_ = model.n_features_in_
+        self.left = arrays["left"]
+        self.right = arrays["right"]
+        # children[2 * nœud] = fils droit, children[2 * nœud + 1] = fils gauche : un seul accès par itération
+        self.children = np.column_stack([self.right, self.left]).ravel()
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.roots = arrays["roots"]
+        self.used_features = arrays["used_features"]
+        self.max_depth = arrays["max_depth"]
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in
+                   ("left", "right", "children", "feature", "threshold", "roots", "used_features", "value"))
+
+    def _used_columns(self, X):
+        if sp.issparse(X):
+            columns = X.tocsr()[:, self.used_features].toarray()
+        else:
+            columns = np.asarray(X)[:, self.used_features]
+        # scikit-learn évalue les arbres en float32
+        return columns.astype(np.float32, copy=False)
+
+    def apply(self, X):
+        """Indice (global) de la feuille atteinte dans chaque arbre : tableau (n_lignes, n_arbres)."""
+        columns = self._used_columns(X)
+        n_rows, n_columns = columns.shape
+        flat_columns = columns.ravel()
+        nodes = np.tile(self.roots, n_rows)
+        # Position de la ligne dans flat_columns pour chaque couple (ligne, arbre)
+        row_offsets = np.repeat(np.arange(n_rows, dtype=np.intp) * n_columns, len(self.roots))
+        # Couples (ligne, arbre) pas encore arrivés sur une feuille
+        active = np.arange(nodes.size, dtype=np.intp)
+        current = nodes
+        offsets = row_offsets
+        while active.size:
+            go_left = flat_columns[offsets + self.feature[current]] <= self.threshold[current]
+            next_nodes = self.children[2 * current + go_left]
+            moved = next_nodes != current
+            n_moved = np.count_nonzero(moved)
+            if n_moved == 0:
+                nodes[active] = next_nodes
+                break
+            if n_moved < active.size // 2:
+                # Compactage seulement quand au moins la moitié des couples est arrivée sur une feuille
+                nodes[active] = next_nodes
+                active = active[moved]
+                current = next_nodes[moved]
+                offsets = row_offsets[active]
+            else:
+                current = next_nodes
+        return nodes.reshape(n_rows, len(self.roots))
+
+    def predict_proba_compiled(self, X):
+        """predict_proba évalué uniquement par le moteur compilé, quelle que soit la taille du batch."""
+        n_rows = X.shape[0]
+        if n_rows <= CHUNK_SIZE:
+            return self._predict_proba(X)
+        return np.vstack([self._predict_proba(X[start:start + CHUNK_SIZE])
+                          for start in range(0, n_rows, CHUNK_SIZE)])
+
+    def predict_proba(self, X):
+        if X.shape[0] > self.max_compiled_batch:
+            return self.model.predict_proba(X)
+        return self.predict_proba_compiled(X)
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+class CompiledRandomForest(CompiledTreeEnsemble):
+    """Équivalent de RandomForestClassifier.predict_proba : moyenne des distributions des feuilles."""
+
+    def __init__(self, model, max_compiled_batch=MAX_COMPILED_BATCH):
+        if model.n_outputs_ != 1:
+            raise ValueError("Seuls les modèles à une sortie sont pris en charge")
+        trees = [estimator.tree_ for estimator in model.estimators_]
+        super().__init__(model, trees, max_compiled_batch)
+        # Distribution des classes normalisée dans chaque nœud (comme DecisionTreeClassifier.predict_proba)
+        values = np.concatenate([tree.value[:, 0, :] for tree in trees]).astype(np.float64)
+        normalizer = values.sum(axis=1, keepdims=True)
+        normalizer[normalizer == 0] = 1
+        self.value = values / normalizer
+
+    def _predict_proba(self, X):
+        return self.value[self.apply(X)].mean(axis=1)
+
+
+class CompiledGradientBoosting(CompiledTreeEnsemble):
+    """Équivalent de GradientBoostingClassifier.predict_proba (binaire, perte logistique)."""
+
+    def __init__(self, model, max_compiled_batch=MAX_COMPILED_BATCH):
+        if len(model.classes_) != 2:
+            raise ValueError("Seul le GradientBoosting binaire est pris en charge")
+        if getattr(model, "loss", "log_loss") not in ("log_loss", "deviance"):
+            raise ValueError(f"Perte non prise en charge : {model.loss}")
+        if model.init not in (None, "zero"):
+            raise ValueError("Seul l'estimateur initial par défaut est pris en charge")
+        trees = [estimator.tree_ for estimator in model.estimators_[:, 0]]
+        super().__init__(model, trees, max_compiled_batch)
+        self.learning_rate = model.learning_rate
+        self.value = np.concatenate([tree.value[:, 0, 0] for tree in trees]).astype(np.float64)
+        # Score initial (constant) : décision sklearn sur une ligne nulle moins la contribution des arbres
+        zero_row = sp.csr_matrix((1, model.n_features_in_))
+        self.init_raw = float(model.decision_function(zero_row)[0]) - self._tree_scores(zero_row)[0]
+
+    def _tree_scores(self, X):
+        return self.learning_rate * self.value[self.apply(X)].sum(axis=1)
+
+    def decision_function(self, X):
+        return self.init_raw + self._tree_scores(X)
+
+    def _predict_proba(self, X):
+        proba_fake = 1 / (1 + np.exp(-self.decision_function(X)))
+        return np.column_stack([1 - proba_fake, proba_fake])
+
+
+def compile_model(model, max_compiled_batch=MAX_COMPILED_BATCH):
+    """Compile un RandomForestClassifier ou un GradientBoostingClassifier ; les autres modèles sont renvoyés tels quels."""
+    kind = type(model).__name__
+    if kind == "RandomForestClassifier":
+        return CompiledRandomForest(model, max_compiled_batch)
+    if kind == "GradientBoostingClassifier":
+        return CompiledGradientBoosting(model, max_compiled_batch)
+    return model
@@ -0,0 +1,134 @@
+"""
+Choix de la bande d'incertitude du mode "cascade" sur le split de test.
+
+Le premier modèle TF-IDF (CASCADE_FIRST_MODEL) et BERT sont évalués une fois
+sur tout le split de test (même découpage que les scripts d'entraînement),
+et la latence d'une requête est mesurée pour chacun. Toutes les bandes
+[bas, haut] de la grille sont ensuite simulées : les textes dont la
+probabilité FAKE tombe dans la bande prennent la réponse de BERT. La bande
+retenue est celle qui atteint l'exactitude visée avec la latence moyenne la
+plus faible.
+
+Exemple :
+    python tune_cascade.py --target-accuracy 0.97 --output results/cascade_band.json
+"""
+
+import argparse
+import json
+import os
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+
+import config
+from dedup import drop_near_duplicates
+from preprocess import clean_texts
+
+
+def mean_latency(fn, texts):
+    """Latence moyenne (en secondes) d'une requête d'un seul texte."""
+    fn(texts[0])
+    start = time.perf_counter()
+    for text in texts:
+        fn(text)
+    return (time.perf_counter() - start) / len(texts)
+
+
+def bert_fake_predictions(bert, texts, batch_size):
+    predictions = []
+    for start in range(0, len(texts), batch_size):
+        outputs = bert(texts[start:start + batch_size], batch_size=batch_size, truncation=True)
+        predictions += [output["label"] == "LABEL_1" for output in outputs]
+    return np.array(predictions, dtype=int)
+
+
+def simulate(p_fake, tree_pred, bert_pred, y, low, high, tree_latency, bert_latency):
+    escalated = (p_fake >= low) & (p_fake <= high)
+    predictions = np.where(escalated, bert_pred, tree_pred)
+    return {
+        "band_low": round(float(low), 3),
+        "band_high": round(float(high), 3),
+        "accuracy": round(float((predictions == y).mean()), 4),
+        "escalation_rate": round(float(escalated.mean()), 4),
+        "expected_latency_ms": round((tree_latency + escalated.mean() * bert_latency) * 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Choix de la bande d'incertitude du mode cascade")
+    parser.add_argument("--data", default="data/all_news_cleaned.csv")
+    parser.add_argument("--first-model", default=config.CASCADE_FIRST_MODEL,
+                        choices=["randomforest", "xgboost", "gradientboosting"])
+    parser.add_argument("--target-accuracy", type=float, default=0.95)
+    parser.add_argument("--step", type=float, default=0.02, help="pas de la grille des bornes")
+    parser.add_argument("--limit", type=int, default=0, help="nombre maximal de textes de test (0 = tous)")
+    parser.add_argument("--batch-size", type=int, default=16, help="taille des batchs BERT")
+    parser.add_argument("--latency-samples", type=int, default=50, help="textes utilisés pour mesurer la latence")
+    parser.add_argument("--output", help="fichier JSON du résultat")
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.data)
+    df.columns = df.columns.str.strip()
+    df["text"] = clean_texts(df["text"], workers=None)
+    # Même split que les scripts d'entraînement : quasi-doublons retirés avant le découpage
+    df, _ = drop_near_duplicates(df, "text")
+    _, X_test, _, y_test = train_test_split(df["text"], df["label"], test_size=0.2, random_state=42)
+    texts = X_test.tolist()[:args.limit or None]
+    y = y_test.to_numpy()[:len(texts)]
+    print(f"{len(texts)} textes de test")
+
+    vectorizer = joblib.load(config.MODEL_PATHS["vectorizer"])
+    model = joblib.load(config.MODEL_PATHS[args.first_model])
+    p_fake = model.predict_proba(vectorizer.transform(texts))[:, 1]
+    tree_pred = (p_fake > 0.5).astype(int)
+
+    from transformers import pipeline
+    bert = pipeline("text-classification", model=config.MODEL_PATHS["bert"], tokenizer=config.BERT_TOKENIZER)
+    bert_pred = bert_fake_predictions(bert, texts, args.batch_size)
+
+    sample = texts[:args.latency_samples]
+    tree_latency = mean_latency(lambda text: model.predict_proba(vectorizer.transform([text])), sample)
+    bert_latency = mean_latency(lambda text: bert([text], truncation=True), sample)
+    print(f"Latence par requête : {args.first_model} {tree_latency * 1000:.2f} ms, bert {bert_latency * 1000:.2f} ms")
+
+    # La bande vide (bas > haut) correspond au premier modèle seul, la bande [0, 1] à BERT seul
+    candidates = [simulate(p_fake, tree_pred, bert_pred, y, 1.0, 0.0, tree_latency, bert_latency)]
+    for low in np.arange(0.0, 0.5 + 1e-9, args.step):
+        for high in np.arange(0.5, 1.0 + 1e-9, args.step):
+            candidates.append(simulate(p_fake, tree_pred, bert_pred, y, low, high, tree_latency, bert_latency))
+
+    reaching = [c for c in candidates if c["accuracy"] >= args.target_accuracy]
+    if reaching:
+        best = min(reaching, key=lambda c: (c["expected_latency_ms"], -c["accuracy"]))
+    else:
+        print(f"Aucune bande n'atteint {args.target_accuracy:.2%} : bande la plus exacte retenue")
+        best = max(candidates, key=lambda c: (c["accuracy"], -c["expected_latency_ms"]))
+
+    result = {
+        "first_model": args.first_model,
+        "target_accuracy": args.target_accuracy,
+        "test_texts": len(texts),
+        "latency_ms": {args.first_model: round(tree_latency * 1000, 3), "bert": round(bert_latency * 1000, 3)},
+        "first_model_only": candidates[0],
+        "bert_only": simulate(p_fake, tree_pred, bert_pred, y, 0.0, 1.0, tree_latency, bert_latency),
+        "best": best,
+        "env": {
+            "CASCADE_FIRST_MODEL": args.first_model,
+            "CASCADE_BAND_LOW": best["band_low"],
+            "CASCADE_BAND_HIGH": best["band_high"],
+        },
+    }
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+        print(f"Résultat écrit dans {args.output}")
+
+
+if __name__ == "__main__":
+    main()